@@ -1,7 +1,7 @@
 """Add events table
 
 Revision ID: add_events_table
-Revises: 20251028_161000_allow_email_null_for_apple_users
+Revises: allow_email_null
 Create Date: 2026-01-11
 
 """
@@ -13,7 +13,7 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision: str = 'add_events_table'
-down_revision: Union[str, None] = '20251028_161000_allow_email_null_for_apple_users'
+down_revision: Union[str, None] = 'allow_email_null'
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
@@ -0,0 +1,37 @@
+"""Add unique constraint on events (user_id, source_event_id)
+
+Revision ID: events_user_source_unique
+Revises: add_events_table
+Create Date: 2026-01-12
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "events_user_source_unique"
+down_revision: str | None = "add_events_table"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Delete-then-insert sync allowed duplicate source ids; keep one row per key
+    op.execute(
+        """
+        DELETE FROM events a
+        USING events b
+        WHERE a.user_id = b.user_id
+          AND a.source_event_id = b.source_event_id
+          AND a.id < b.id
+        """
+    )
+    op.create_unique_constraint(
+        "uq_events_user_source", "events", ["user_id", "source_event_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_events_user_source", "events", type_="unique")
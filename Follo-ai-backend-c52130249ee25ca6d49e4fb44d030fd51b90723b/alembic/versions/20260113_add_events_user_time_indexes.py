@@ -0,0 +1,54 @@
+"""Add composite (user_id, start_at/end_at) indexes on events
+
+Revision ID: events_user_time_indexes
+Revises: events_user_source_unique
+Create Date: 2026-01-13
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "events_user_time_indexes"
+down_revision: str | None = "events_user_source_unique"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_events_user_start",
+            "events",
+            ["user_id", "start_at"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_events_user_end",
+            "events",
+            ["user_id", "end_at"],
+            postgresql_concurrently=True,
+        )
+        # Covered by the composite indexes and uq_events_user_source
+        op.drop_index(
+            "ix_events_user_id", table_name="events", postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_events_user_id",
+            "events",
+            ["user_id"],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_events_user_end", table_name="events", postgresql_concurrently=True
+        )
+        op.drop_index(
+            "ix_events_user_start", table_name="events", postgresql_concurrently=True
+        )
@@ -0,0 +1,39 @@
+"""Store events.id as a native uuid
+
+Revision ID: events_id_uuid
+Revises: add_event_sync_state
+Create Date: 2026-01-15
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "events_id_uuid"
+down_revision: str | None = "add_event_sync_state"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        "events",
+        "id",
+        type_=sa.Uuid(),
+        existing_type=sa.String(36),
+        postgresql_using="id::uuid",
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        "events",
+        "id",
+        type_=sa.String(36),
+        existing_type=sa.Uuid(),
+        postgresql_using="id::text",
+    )
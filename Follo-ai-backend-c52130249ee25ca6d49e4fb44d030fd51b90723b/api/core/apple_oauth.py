@@ -1,14 +1,26 @@
 """Apple OAuth 2.0 验证工具"""
 
-import base64
-import json
+import asyncio
+import logging
 import time
 from typing import Dict, Optional
 
 import httpx
+from cryptography.hazmat.primitives import serialization
 from jose import jwt
 
 from api.core.config import settings
+from api.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+APPLE_AUTH_URL = "https://appleid.apple.com"
+APPLE_TOKEN_PATH = "/auth/token"
+
+# client secret 有效期（秒），180 天；Apple 允许的上限为 15777000 秒（约 6 个月）
+CLIENT_SECRET_TTL = 180 * 24 * 3600
+# 距离过期不足该秒数时重新签名
+CLIENT_SECRET_REFRESH_MARGIN = 600
 
 
 class AppleOAuthService:
@@ -19,8 +31,6 @@ class AppleOAuthService:
         self.team_id = settings.APPLE_TEAM_ID
         self.key_id = settings.APPLE_KEY_ID
         self.private_key = settings.APPLE_PRIVATE_KEY
-        self.apple_auth_url = "https://appleid.apple.com"
-        self.token_endpoint = f"{self.apple_auth_url}/auth/token"
 
         # 检查配置是否完整
         if not all([self.client_id, self.team_id, self.key_id, self.private_key]):
@@ -28,8 +38,75 @@ class AppleOAuthService:
         else:
             self.is_configured = True
 
+        # 预先解析私钥，避免每次签名都重新解析 PEM
+        self._signing_key = self._load_signing_key()
+
+        # 复用同一个 HTTP 客户端，保持到 Apple 的 TLS 连接
+        self._http = httpx.AsyncClient(
+            base_url=APPLE_AUTH_URL,
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+        )
+
+        # 已签名的 client secret 缓存，在过期前 10 分钟内才重新签名
+        self._cached_secret: str | None = None
+        self._cached_exp: int = 0
+        # 缓存失效时只允许一个协程签名，其余等待并复用结果
+        self._secret_lock = asyncio.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "AppleOAuthService | _UnconfiguredAppleOAuthService":
+        """根据配置创建服务；未配置时返回占位服务，不创建 HTTP 客户端"""
+        if not all(
+            [
+                settings.APPLE_CLIENT_ID,
+                settings.APPLE_TEAM_ID,
+                settings.APPLE_KEY_ID,
+                settings.APPLE_PRIVATE_KEY,
+            ]
+        ):
+            return _UnconfiguredAppleOAuthService()
+        return cls()
+
+    def _load_signing_key(self):
+        """解析 PEM 私钥，解析失败时保留原始字符串，由签名时报告错误"""
+        if not self.private_key:
+            return None
+        try:
+            return serialization.load_pem_private_key(
+                self.private_key.encode("utf-8"), password=None
+            )
+        except (ValueError, TypeError) as e:
+            logger.debug("私钥无法解析为 cryptography 对象: %s", e)
+            return self.private_key
+
+    def _get_cached_client_secret(self) -> Optional[str]:
+        """返回仍在有效期内的 client secret，没有则返回 None"""
+        if (
+            self._cached_secret
+            and self._cached_exp - int(time.time()) > CLIENT_SECRET_REFRESH_MARGIN
+        ):
+            return self._cached_secret
+        return None
+
+    async def _get_client_secret(self) -> str:
+        """获取 client secret，缓存未命中时加锁并在线程池中签名，避免阻塞事件循环"""
+        cached = self._get_cached_client_secret()
+        if cached:
+            return cached
+        async with self._secret_lock:
+            # 等锁期间可能已有其他协程完成签名
+            cached = self._get_cached_client_secret()
+            if cached:
+                return cached
+            return await asyncio.to_thread(self._create_client_secret)
+
     def _create_client_secret(self) -> str:
-        """创建客户端密钥 (JWT)"""
+        """创建客户端密钥 (JWT)，在有效期内复用已签名的结果"""
+        cached = self._get_cached_client_secret()
+        if cached:
+            return cached
+
         now = int(time.time())
 
         # JWT Header
@@ -42,57 +119,49 @@ class AppleOAuthService:
         payload = {
             "iss": self.team_id,
             "iat": now,
-            "exp": now + 3600,  # 1小时过期
-            "aud": self.apple_auth_url,
+            "exp": now + CLIENT_SECRET_TTL,
+            "aud": APPLE_AUTH_URL,
             "sub": self.client_id,
         }
 
         # 生成 JWT token
         try:
-            print(f"准备创建JWT client secret...")
-            print(f"  - Team ID: {self.team_id}")
-            print(f"  - Key ID: {self.key_id}")
-            print(f"  - Client ID: {self.client_id}")
-            print(f"  - Audience: {self.apple_auth_url}")
-            print(f"  - 私钥长度: {len(self.private_key)}")
-            print(f"  - 私钥前缀: {self.private_key[:30]}...")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "准备创建JWT client secret: team_id=%s, key_id=%s, "
+                    "client_id=%s, audience=%s, 私钥长度=%d, 私钥前缀=%s...",
+                    self.team_id,
+                    self.key_id,
+                    self.client_id,
+                    APPLE_AUTH_URL,
+                    len(self.private_key),
+                    self.private_key[:30],
+                )
 
             client_secret = jwt.encode(
                 payload,
-                self.private_key,
+                self._signing_key,
                 algorithm="ES256",
                 headers=header,
             )
 
-            print(f"✅ JWT client secret 创建成功，长度: {len(client_secret)}")
+            logger.debug("JWT client secret 创建成功，长度: %d", len(client_secret))
+            self._cached_secret = client_secret
+            self._cached_exp = payload["exp"]
             return client_secret
 
         except Exception as e:
-            print(f"❌ 创建客户端密钥失败: {e}")
-            print(f"   错误类型: {type(e).__name__}")
-            print(f"   私钥内容预览: {self.private_key[:50]}...")
-            print(f"   私钥格式检查:")
-            print(
-                f"     - 以 '-----BEGIN' 开头: {self.private_key.startswith('-----BEGIN')}"
-            )
-            print(f"     - 以 '-----END' 结尾: {self.private_key.endswith('-----END')}")
-            print(
-                f"     - 包含换行符: {chr(10) in self.private_key or '\\n' in self.private_key}"
-            )
-
-            # 尝试加载密钥以获取更详细的错误信息
-            try:
-                from cryptography.hazmat.backends import default_backend
-                from cryptography.hazmat.primitives import serialization
-
-                key = serialization.load_pem_private_key(
-                    self.private_key.encode("utf-8"),
-                    password=None,
-                    backend=default_backend(),
+            logger.error("创建客户端密钥失败: %s (%s)", e, type(e).__name__)
+
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "私钥格式检查: 预览=%s..., 以 '-----BEGIN' 开头=%s, "
+                    "以 '-----END' 结尾=%s, 包含换行符=%s",
+                    self.private_key[:50],
+                    self.private_key.startswith("-----BEGIN"),
+                    self.private_key.endswith("-----END"),
+                    "\n" in self.private_key or "\\n" in self.private_key,
                 )
-                print(f"   私钥可以正常加载为 cryptography 对象")
-            except Exception as load_error:
-                print(f"   ❌ 私钥加载也失败: {load_error}")
 
             raise
 
@@ -101,11 +170,7 @@ class AppleOAuthService:
     ) -> Optional[Dict]:
         """验证授权码并获取用户信息"""
 
-        # 检查是否已配置
-        if not self.is_configured:
-            raise ValueError("Apple OAuth is not configured")
-
-        client_secret = self._create_client_secret()
+        client_secret = await self._get_client_secret()
 
         # 请求参数
         data = {
@@ -119,75 +184,54 @@ class AppleOAuthService:
             "Content-Type": "application/x-www-form-urlencoded",
         }
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    self.token_endpoint,
-                    data=data,
-                    headers=headers,
-                    timeout=10.0,
-                )
-
-                if response.status_code != 200:
-                    return None
-
-                token_data = response.json()
-
-                # 解析 id_token 获取用户信息
-                id_token = token_data.get("id_token")
-                if not id_token:
-                    return None
+        try:
+            response = await self._http.post(
+                APPLE_TOKEN_PATH, data=data, headers=headers
+            )
 
-                print(f"获取到id_token，长度: {len(id_token)}")
+            if response.status_code != 200:
+                return None
 
-                # 手动解码JWT payload（不验证signature）
-                try:
-                    # JWT格式: header.payload.signature
-                    parts = id_token.split(".")
-                    if len(parts) != 3:
-                        print(f"❌ id_token格式错误，分段数: {len(parts)}")
-                        return None
+            token_data = response.json()
 
-                    # 解码payload (第2段)
-                    payload = parts[1]
+            # 解析 id_token 获取用户信息
+            id_token = token_data.get("id_token")
+            if not id_token:
+                return None
 
-                    # 添加必要的填充
-                    padding = len(payload) % 4
-                    if padding:
-                        payload += "=" * (4 - padding)
+            logger.debug("获取到id_token，长度: %d", len(id_token))
 
-                    decoded_bytes = base64.urlsafe_b64decode(payload)
-                    decoded = json.loads(decoded_bytes)
+            # 解码 id_token payload（不验证 signature）
+            try:
+                decoded = jwt.get_unverified_claims(id_token)
 
-                    print(f"✅ 成功解码id_token payload")
-                    print(f"   Apple ID: {decoded.get('sub')}")
-                    print(f"   Email: {decoded.get('email')}")
+                logger.debug(
+                    "成功解码id_token payload: apple_id=%s, email=%s",
+                    decoded.get("sub"),
+                    decoded.get("email"),
+                )
 
-                except Exception as decode_error:
-                    print(f"❌ 解码id_token失败: {decode_error}")
-                    return None
+            except Exception as decode_error:
+                logger.error("解码id_token失败: %s", decode_error)
+                return None
 
-                return {
-                    "apple_id": decoded.get("sub"),
-                    "email": decoded.get("email"),
-                    "is_email_verified": decoded.get("email_verified"),
-                    "is_real_email": decoded.get("is_private_email"),
-                    "access_token": token_data.get("access_token"),
-                    "refresh_token": token_data.get("refresh_token"),
-                }
+            return {
+                "apple_id": decoded.get("sub"),
+                "email": decoded.get("email"),
+                "is_email_verified": decoded.get("email_verified"),
+                "is_real_email": decoded.get("is_private_email"),
+                "access_token": token_data.get("access_token"),
+                "refresh_token": token_data.get("refresh_token"),
+            }
 
-            except Exception as e:
-                print(f"Apple OAuth error: {e}")
-                return None
+        except Exception as e:
+            logger.error("Apple OAuth error: %s", e)
+            return None
 
     async def refresh_access_token(self, refresh_token: str) -> Optional[Dict]:
         """刷新访问令牌"""
 
-        # 检查是否已配置
-        if not self.is_configured:
-            raise ValueError("Apple OAuth is not configured")
-
-        client_secret = self._create_client_secret()
+        client_secret = await self._get_client_secret()
 
         data = {
             "grant_type": "refresh_token",
@@ -200,24 +244,41 @@ class AppleOAuthService:
             "Content-Type": "application/x-www-form-urlencoded",
         }
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    self.token_endpoint,
-                    data=data,
-                    headers=headers,
-                    timeout=10.0,
-                )
+        try:
+            response = await self._http.post(
+                APPLE_TOKEN_PATH, data=data, headers=headers
+            )
 
-                if response.status_code != 200:
-                    return None
+            if response.status_code != 200:
+                return None
 
-                return response.json()
+            return response.json()
 
-            except Exception as e:
-                print(f"Apple token refresh error: {e}")
-                return None
+        except Exception as e:
+            logger.error("Apple token refresh error: %s", e)
+            return None
+
+    async def aclose(self) -> None:
+        """关闭 HTTP 客户端"""
+        await self._http.aclose()
+
+
+class _UnconfiguredAppleOAuthService:
+    """未配置 Apple 登录时使用的占位服务"""
+
+    is_configured = False
+
+    async def verify_authorization_code(
+        self, authorization_code: str
+    ) -> Optional[Dict]:
+        raise ValueError("Apple OAuth is not configured")
+
+    async def refresh_access_token(self, refresh_token: str) -> Optional[Dict]:
+        raise ValueError("Apple OAuth is not configured")
+
+    async def aclose(self) -> None:
+        pass
 
 
-# 单例实例
-apple_oauth = AppleOAuthService()
+# 单例实例，未配置时使用占位服务
+apple_oauth = AppleOAuthService.from_settings()
@@ -6,12 +6,18 @@ class Settings(BaseSettings):
 
     PROJECT_NAME: str = "Hero API"
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 10  # connections kept open per worker
+    DB_MAX_OVERFLOW: int = 20  # extra connections allowed under load
     DEBUG: bool = False
 
+    # CORS Settings; credentials are only allowed with an explicit allowlist
+    CORS_ORIGINS: list[str] = ["*"]
+
     # JWT Settings
     JWT_SECRET: str  # Change in production
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION: int = 30  # minutes
+    JWT_CACHE_ENABLED: bool = True  # reuse refresh token verification for 60s
 
     # Apple Sign In Settings (optional)
     APPLE_CLIENT_ID: str | None = None
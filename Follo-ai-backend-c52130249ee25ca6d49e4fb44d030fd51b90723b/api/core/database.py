@@ -1,13 +1,19 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 
 from api.core.config import settings
 
-# Create async engine
-engine = create_async_engine(settings.DATABASE_URL, echo=False, future=True)
+# Create async engine, shared by every session for the life of the process
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=False,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    query_cache_size=1200,
+)
 
 # Create async session factory
-async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+async_session = async_sessionmaker(engine, expire_on_commit=False)
 
 # Create declarative base for models
 Base = declarative_base()
@@ -24,3 +30,18 @@ async def get_session() -> AsyncSession:
             yield session
         finally:
             await session.close()
+
+
+async def get_readonly_session() -> AsyncSession:
+    """Dependency for getting an async session for read-only endpoints.
+
+    Autoflush is disabled since nothing is written through this session.
+
+    Yields:
+        AsyncSession: Async database session
+    """
+    async with async_session(autoflush=False) as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -27,3 +27,10 @@ class ForbiddenException(HTTPException):
 
     def __init__(self, detail: str = "Access forbidden"):
         super().__init__(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
+
+class DashscopeError(Exception):
+    """Base exception for Dashscope/Qwen AI service errors.
+
+    Handled globally and returned as an unsuccessful BackendAPIResponse.
+    """
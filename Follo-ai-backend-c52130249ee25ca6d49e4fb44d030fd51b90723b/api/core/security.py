@@ -1,8 +1,15 @@
-from datetime import datetime, timedelta
-
+import base64
+import hashlib
+import time
+from datetime import timedelta
+from functools import lru_cache
+
+import orjson
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
 from passlib.context import CryptContext
 
 from api.core.config import settings
@@ -16,6 +23,38 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 # Refresh token expiration (7 days)
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
+# Default token lifetimes in seconds
+_ACCESS_TOKEN_TTL = settings.JWT_EXPIRATION * 60
+_REFRESH_TOKEN_TTL = REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600
+
+# Recently verified refresh tokens, keyed by a digest of the token. Only valid
+# tokens are stored, so retries with the same token skip signature checks.
+_verified_refresh_tokens: TTLCache[bytes, dict] = TTLCache(maxsize=10_000, ttl=60)
+
+
+@lru_cache(maxsize=1)
+def _get_jwt_key() -> Key:
+    """Build the JWT signing/verification key once per process."""
+    return jwk.construct(settings.JWT_SECRET, settings.JWT_ALGORITHM)
+
+
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+# Header segment shared by every token we sign, same bytes python-jose produces
+_ENCODED_HEADER = _b64url(
+    orjson.dumps(
+        {"alg": settings.JWT_ALGORITHM, "typ": "JWT"}, option=orjson.OPT_SORT_KEYS
+    )
+)
+
+
+def _sign(payload: dict) -> str:
+    signing_input = _ENCODED_HEADER + b"." + _b64url(orjson.dumps(payload))
+    signature = _b64url(_get_jwt_key().sign(signing_input))
+    return (signing_input + b"." + signature).decode("ascii")
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
@@ -29,33 +68,46 @@ def get_password_hash(password: str) -> str:
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     """Create JWT access token."""
-    to_encode = data.copy()
-    expire = datetime.utcnow() + (
-        expires_delta or timedelta(minutes=settings.JWT_EXPIRATION)
-    )
-    to_encode.update({"exp": expire, "type": "access"})
-    return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+    ttl = int(expires_delta.total_seconds()) if expires_delta else _ACCESS_TOKEN_TTL
+    return _sign({**data, "exp": int(time.time()) + ttl, "type": "access"})
 
 
 def create_refresh_token(data: dict) -> str:
     """Create JWT refresh token."""
-    to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
-    return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+    return _sign(
+        {**data, "exp": int(time.time()) + _REFRESH_TOKEN_TTL, "type": "refresh"}
+    )
+
+
+def create_token_pair(sub: str) -> tuple[str, str]:
+    """Create an access token and a refresh token for the same subject."""
+    now = int(time.time())
+    access_token = _sign({"sub": sub, "exp": now + _ACCESS_TOKEN_TTL, "type": "access"})
+    refresh_token = _sign(
+        {"sub": sub, "exp": now + _REFRESH_TOKEN_TTL, "type": "refresh"}
+    )
+    return access_token, refresh_token
 
 
 def verify_refresh_token(token: str) -> dict | None:
     """Verify refresh token and return payload."""
+    if settings.JWT_CACHE_ENABLED:
+        cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        payload = _verified_refresh_tokens.get(cache_key)
+        # The cache TTL may outlive the token itself
+        if payload is not None and payload["exp"] > time.time():
+            return payload
+
     try:
-        payload = jwt.decode(
-            token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
-        )
-        if payload.get("type") != "refresh":
-            return None
-        return payload
+        payload = jwt.decode(token, _get_jwt_key(), algorithms=[settings.JWT_ALGORITHM])
     except JWTError:
         return None
+    if payload.get("type") != "refresh":
+        return None
+
+    if settings.JWT_CACHE_ENABLED:
+        _verified_refresh_tokens[cache_key] = payload
+    return payload
 
 
 async def get_current_user(token: str = Depends(oauth2_scheme)):
@@ -67,9 +119,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     )
 
     try:
-        payload = jwt.decode(
-            token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
-        )
+        payload = jwt.decode(token, _get_jwt_key(), algorithms=[settings.JWT_ALGORITHM])
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
@@ -77,11 +127,12 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         raise credentials_exception
 
     # Import here to avoid circular imports
-    from api.core.database import get_session
-    from api.src.users.service import UserService
+    from api.core.database import async_session
+    from api.src.users.models import User
 
-    async for session in get_session():
-        user = await UserService(session).get_user(int(user_id))
-        if user is None:
-            raise credentials_exception
-        return user
+    # Primary-key lookup; the session is closed before the route runs
+    async with async_session() as session:
+        user = await session.get(User, int(user_id))
+    if user is None:
+        raise credentials_exception
+    return user
@@ -1,13 +1,21 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic.json_schema import models_json_schema
 
+from api.core.apple_oauth import apple_oauth
 from api.core.config import settings
+from api.core.exceptions import DashscopeError
 from api.core.logging import get_logger, setup_logging
-from api.src.heroes.routes import router as heroes_router
-from api.src.users.routes import router as auth_router
+from api.src.context.routes import router as context_router
+from api.src.context.schemas import ContextEngineRequest
 from api.src.dashscope.routes import router as dashscope_router
+from api.src.dashscope.schemas import BackendAPIResponse
 from api.src.events.routes import router as events_router
-from api.src.context.routes import router as context_router
+from api.src.heroes.routes import router as heroes_router
+from api.src.users.routes import router as auth_router
 
 # Set up logging configuration
 setup_logging()
@@ -18,20 +26,31 @@ setup_logging()
 # Set up logger for this module
 logger = get_logger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown."""
+    yield
+    await apple_oauth.aclose()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     debug=settings.DEBUG,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
+    allow_origins=settings.CORS_ORIGINS,
+    allow_credentials="*" not in settings.CORS_ORIGINS,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+
 # Include routers with /api/v1 prefix
 app.include_router(auth_router, prefix="/api/v1")
 app.include_router(heroes_router, prefix="/api/v1")
@@ -40,6 +59,33 @@ app.include_router(events_router, prefix="/api/v1")
 app.include_router(context_router, prefix="/api/v1")
 
 
+def _openapi() -> dict:
+    """Build the schema once, adding bodies documented only via openapi_extra."""
+    if app.openapi_schema is None:
+        schema = FastAPI.openapi(app)
+        _, definitions = models_json_schema(
+            [(ContextEngineRequest, "validation")],
+            ref_template="#/components/schemas/{model}",
+        )
+        schema["components"]["schemas"].update(definitions["$defs"])
+    return app.openapi_schema
+
+
+app.openapi = _openapi
+
+
+@app.exception_handler(DashscopeError)
+async def dashscope_error_handler(request: Request, exc: DashscopeError):
+    """Return Dashscope failures as an unsuccessful BackendAPIResponse."""
+    logger.error("%s failed: %s", request.url.path, exc)
+    return ORJSONResponse(
+        status_code=200,
+        content=BackendAPIResponse(
+            success=False, data=None, message=str(exc)
+        ).model_dump(),
+    )
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 
 from api.core.logging import get_logger
 from api.core.security import get_current_user
@@ -11,26 +13,58 @@ logger = get_logger(__name__)
 router = APIRouter(prefix="/context", tags=["context"])
 
 
-@router.post("/engine", response_model=ContextEngineResponse)
+# The body is parsed by parse_context_request, so document it explicitly;
+# the schema itself is registered in components by api.main
+_REQUEST_BODY_DOC = {
+    "requestBody": {
+        "content": {
+            "application/json": {
+                "schema": {"$ref": "#/components/schemas/ContextEngineRequest"}
+            }
+        },
+        "required": True,
+    }
+}
+
+
+async def parse_context_request(request: Request) -> ContextEngineRequest:
+    """Validate the snapshot straight from the raw JSON body in one pass."""
+    try:
+        return ContextEngineRequest.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors()]
+        )
+
+
+@router.post(
+    "/engine",
+    response_model=ContextEngineResponse,
+    openapi_extra=_REQUEST_BODY_DOC,
+)
 async def context_engine(
-    request: ContextEngineRequest,
+    request: ContextEngineRequest = Depends(parse_context_request),
     current_user: User = Depends(get_current_user),
 ) -> ContextEngineResponse:
     """
     Process context snapshot and return decision with optional notification.
     """
-    logger.debug(f"Context engine request from user {current_user.id}, trigger: {request.trigger}")
+    logger.debug(
+        "Context engine request from user %s, trigger: %s",
+        current_user.id,
+        request.trigger,
+    )
     try:
-        response = await ContextService.process_context(
+        response = ContextService.process_context(
             user=current_user,
             trigger=request.trigger,
             snapshot=request.snapshot
         )
-        logger.info(f"Context engine decision: {response.decision}")
+        logger.info("Context engine decision: %s", response.decision)
         return response
     except Exception as e:
-        logger.error(f"Context engine failed: {str(e)}")
-        return ContextEngineResponse(
+        logger.exception("Context engine failed: %s", e)
+        return ContextEngineResponse.model_construct(
             decision="error",
             reasoning=str(e),
             notification=None
@@ -1,3 +1,5 @@
+from typing import Callable
+
 from api.core.logging import get_logger
 from api.src.context.schemas import (
     ContextEngineResponse,
@@ -8,12 +10,93 @@ from api.src.users.models import User
 
 logger = get_logger(__name__)
 
+# (decision, reasoning, notification)
+TriggerResult = tuple[str, str | None, NotificationPayload | None]
+
+# Static notification fields per trigger; only the body is built per request
+_PAYLOAD_TEMPLATES: dict[str, dict[str, str]] = {
+    "location_change": {
+        "priority": "normal",
+        "title": "即将开始的活动",
+        "action_label": "查看详情",
+    },
+    "time_based": {
+        "priority": "high",
+        "title": "活动提醒",
+        "action_label": "准备出发",
+    },
+    "health_alert": {
+        "priority": "high",
+        "title": "健康提醒",
+        "action_label": "了解更多",
+    },
+}
+
+
+def _handle_location_change(snapshot: ContextSnapshot) -> TriggerResult:
+    """Check if user arrived at a location with an event."""
+    if not snapshot.calendar_events:
+        return "no_action", None, None
+    next_event = snapshot.calendar_events[0]
+    return (
+        "notify",
+        f"User arrived at location, upcoming event: {next_event.title}",
+        NotificationPayload.model_construct(
+            body=f"您的活动 '{next_event.title}' 即将开始",
+            **_PAYLOAD_TEMPLATES["location_change"]
+        ),
+    )
+
+
+def _handle_time_based(snapshot: ContextSnapshot) -> TriggerResult:
+    """Time-based reminder check."""
+    if not snapshot.calendar_events:
+        return "no_action", None, None
+    next_event = snapshot.calendar_events[0]
+    return (
+        "notify",
+        f"Time-based reminder for: {next_event.title}",
+        NotificationPayload.model_construct(
+            body=f"您的活动 '{next_event.title}' 将在15分钟后开始",
+            **_PAYLOAD_TEMPLATES["time_based"]
+        ),
+    )
+
+
+def _handle_activity_change(snapshot: ContextSnapshot) -> TriggerResult:
+    """Activity state change."""
+    if not (snapshot.motion and snapshot.motion.activity_type):
+        return "no_action", None, None
+    return "monitor", f"Activity changed to: {snapshot.motion.activity_type}", None
+
+
+def _handle_health_alert(snapshot: ContextSnapshot) -> TriggerResult:
+    """Health data alert."""
+    if not snapshot.health:
+        return "no_action", None, None
+    return (
+        "notify",
+        "Health data requires attention",
+        NotificationPayload.model_construct(
+            body="建议您适当休息，注意身体状况",
+            **_PAYLOAD_TEMPLATES["health_alert"]
+        ),
+    )
+
+
+_HANDLERS: dict[str, Callable[[ContextSnapshot], TriggerResult]] = {
+    "location_change": _handle_location_change,
+    "time_based": _handle_time_based,
+    "activity_change": _handle_activity_change,
+    "health_alert": _handle_health_alert,
+}
+
 
 class ContextService:
     """Service for context engine operations."""
 
     @staticmethod
-    async def process_context(
+    def process_context(
         user: User,
         trigger: str,
         snapshot: ContextSnapshot
@@ -21,64 +104,20 @@ class ContextService:
         """
         Process context snapshot and determine if notification is needed.
         """
-        logger.info(f"Processing context for user {user.id}, trigger: {trigger}")
+        logger.info("Processing context for user %s, trigger: %s", user.id, trigger)
 
         # TODO: Integrate with actual AI service for context analysis
         # For now, return a mock response based on trigger type
 
-        decision = "no_action"
-        reasoning = None
-        notification = None
-
-        if trigger == "location_change":
-            # Check if user arrived at a location with an event
-            if snapshot.calendar_events:
-                next_event = snapshot.calendar_events[0]
-                decision = "notify"
-                reasoning = f"User arrived at location, upcoming event: {next_event.title}"
-                notification = NotificationPayload(
-                    priority="normal",
-                    title="即将开始的活动",
-                    body=f"您的活动 '{next_event.title}' 即将开始",
-                    action_label="查看详情"
-                )
-
-        elif trigger == "time_based":
-            # Time-based reminder check
-            if snapshot.calendar_events:
-                next_event = snapshot.calendar_events[0]
-                decision = "notify"
-                reasoning = f"Time-based reminder for: {next_event.title}"
-                notification = NotificationPayload(
-                    priority="high",
-                    title="活动提醒",
-                    body=f"您的活动 '{next_event.title}' 将在15分钟后开始",
-                    action_label="准备出发"
-                )
-
-        elif trigger == "activity_change":
-            # Activity state change
-            if snapshot.motion and snapshot.motion.activity_type:
-                decision = "monitor"
-                reasoning = f"Activity changed to: {snapshot.motion.activity_type}"
-
-        elif trigger == "health_alert":
-            # Health data alert
-            if snapshot.health:
-                decision = "notify"
-                reasoning = "Health data requires attention"
-                notification = NotificationPayload(
-                    priority="high",
-                    title="健康提醒",
-                    body="建议您适当休息，注意身体状况",
-                    action_label="了解更多"
-                )
-
+        handler = _HANDLERS.get(trigger)
+        if handler is None:
+            decision, reasoning, notification = (
+                "no_action", f"Unknown trigger type: {trigger}", None
+            )
         else:
-            decision = "no_action"
-            reasoning = f"Unknown trigger type: {trigger}"
+            decision, reasoning, notification = handler(snapshot)
 
-        return ContextEngineResponse(
+        return ContextEngineResponse.model_construct(
             decision=decision,
             reasoning=reasoning,
             notification=notification
@@ -1,5 +1,10 @@
+from collections.abc import AsyncIterator
+
+import orjson
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 
+from api.core.exceptions import DashscopeError
 from api.core.logging import get_logger
 from api.core.security import get_current_user
 from api.src.users.models import User
@@ -19,26 +24,29 @@ logger = get_logger(__name__)
 router = APIRouter(prefix="/dashscope", tags=["dashscope"])
 
 
+async def _sse(chunks: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    """Encode text chunks as server-sent events carrying TextResponse JSON."""
+    try:
+        async for chunk in chunks:
+            yield b"data: " + orjson.dumps({"text": chunk}) + b"\n\n"
+    except DashscopeError as e:
+        # Headers are already sent, so report the failure as an SSE event
+        logger.error("Chat stream failed: %s", e)
+        yield b"event: error\ndata: " + orjson.dumps({"message": str(e)}) + b"\n\n"
+
+
 @router.post("/greeting", response_model=BackendAPIResponse)
 async def greeting(
     current_user: User = Depends(get_current_user),
 ) -> BackendAPIResponse:
     """Get a greeting message."""
-    logger.debug(f"Greeting request from user: {current_user.id}")
-    try:
-        text = await DashscopeService.get_greeting(current_user)
-        return BackendAPIResponse(
-            success=True,
-            data=TextResponse(text=text),
-            message="Greeting generated successfully"
-        )
-    except Exception as e:
-        logger.error(f"Greeting failed: {str(e)}")
-        return BackendAPIResponse(
-            success=False,
-            data=None,
-            message=str(e)
-        )
+    logger.debug("Greeting request from user: %s", current_user.id)
+    text = await DashscopeService.get_greeting(current_user)
+    return BackendAPIResponse.model_construct(
+        success=True,
+        data=TextResponse.model_construct(text=text),
+        message="Greeting generated successfully"
+    )
 
 
 @router.post("/har", response_model=BackendAPIResponse)
@@ -47,26 +55,18 @@ async def har_analysis(
     current_user: User = Depends(get_current_user),
 ) -> BackendAPIResponse:
     """Perform HAR (Human Activity Recognition) analysis."""
-    logger.debug(f"HAR analysis request from user: {current_user.id}")
-    try:
-        text = await DashscopeService.har_analysis(
-            user_info=request.user_info,
-            calendar_json=request.calendar_json,
-            sensor_json=request.sensor_json,
-            current_time_info=request.current_time_info,
-        )
-        return BackendAPIResponse(
-            success=True,
-            data=TextResponse(text=text),
-            message="HAR analysis completed"
-        )
-    except Exception as e:
-        logger.error(f"HAR analysis failed: {str(e)}")
-        return BackendAPIResponse(
-            success=False,
-            data=None,
-            message=str(e)
-        )
+    logger.debug("HAR analysis request from user: %s", current_user.id)
+    text = await DashscopeService.har_analysis(
+        user_info=request.user_info,
+        calendar_json=request.calendar_json,
+        sensor_json=request.sensor_json,
+        current_time_info=request.current_time_info,
+    )
+    return BackendAPIResponse.model_construct(
+        success=True,
+        data=TextResponse.model_construct(text=text),
+        message="HAR analysis completed"
+    )
 
 
 @router.post("/recommendations", response_model=BackendAPIResponse)
@@ -75,26 +75,18 @@ async def get_recommendations(
     current_user: User = Depends(get_current_user),
 ) -> BackendAPIResponse:
     """Get personalized recommendations."""
-    logger.debug(f"Recommendations request from user: {current_user.id}")
-    try:
-        text = await DashscopeService.get_recommendations(
-            user_info=request.user_info,
-            calendar_json=request.calendar_json,
-            sensor_json=request.sensor_json,
-            time=request.time,
-        )
-        return BackendAPIResponse(
-            success=True,
-            data=TextResponse(text=text),
-            message="Recommendations generated"
-        )
-    except Exception as e:
-        logger.error(f"Recommendations failed: {str(e)}")
-        return BackendAPIResponse(
-            success=False,
-            data=None,
-            message=str(e)
-        )
+    logger.debug("Recommendations request from user: %s", current_user.id)
+    text = await DashscopeService.get_recommendations(
+        user_info=request.user_info,
+        calendar_json=request.calendar_json,
+        sensor_json=request.sensor_json,
+        time=request.time,
+    )
+    return BackendAPIResponse.model_construct(
+        success=True,
+        data=TextResponse.model_construct(text=text),
+        message="Recommendations generated"
+    )
 
 
 @router.post("/meeting-assistant", response_model=BackendAPIResponse)
@@ -103,29 +95,21 @@ async def meeting_assistant(
     current_user: User = Depends(get_current_user),
 ) -> BackendAPIResponse:
     """Get meeting scheduling assistance."""
-    logger.debug(f"Meeting assistant request from user: {current_user.id}")
-    try:
-        text = await DashscopeService.meeting_assistant(
-            prompt_text=request.prompt_text,
-            recipient_name=request.recipient_name,
-            recipient_prefs_json=request.recipient_prefs_json,
-            recipient_calendar_json=request.recipient_calendar_json,
-            requester_name=request.requester_name,
-            requester_user_info=request.requester_user_info,
-            requester_calendar_events=request.requester_calendar_events,
-        )
-        return BackendAPIResponse(
-            success=True,
-            data=TextResponse(text=text),
-            message="Meeting assistant response generated"
-        )
-    except Exception as e:
-        logger.error(f"Meeting assistant failed: {str(e)}")
-        return BackendAPIResponse(
-            success=False,
-            data=None,
-            message=str(e)
-        )
+    logger.debug("Meeting assistant request from user: %s", current_user.id)
+    text = await DashscopeService.meeting_assistant(
+        prompt_text=request.prompt_text,
+        recipient_name=request.recipient_name,
+        recipient_prefs_json=request.recipient_prefs_json,
+        recipient_calendar_json=request.recipient_calendar_json,
+        requester_name=request.requester_name,
+        requester_user_info=request.requester_user_info,
+        requester_calendar_events=request.requester_calendar_events,
+    )
+    return BackendAPIResponse.model_construct(
+        success=True,
+        data=TextResponse.model_construct(text=text),
+        message="Meeting assistant response generated"
+    )
 
 
 @router.post("/quick-create", response_model=BackendAPIResponse)
@@ -134,26 +118,18 @@ async def quick_create(
     current_user: User = Depends(get_current_user),
 ) -> BackendAPIResponse:
     """Quick create event or task."""
-    logger.debug(f"Quick create request from user: {current_user.id}")
-    try:
-        text = await DashscopeService.quick_create(
-            prompt=request.prompt,
-            user_info=request.user_info,
-            calendar_events=request.calendar_events,
-            recent_status_data=request.recent_status_data,
-        )
-        return BackendAPIResponse(
-            success=True,
-            data=TextResponse(text=text),
-            message="Quick create response generated"
-        )
-    except Exception as e:
-        logger.error(f"Quick create failed: {str(e)}")
-        return BackendAPIResponse(
-            success=False,
-            data=None,
-            message=str(e)
-        )
+    logger.debug("Quick create request from user: %s", current_user.id)
+    text = await DashscopeService.quick_create(
+        prompt=request.prompt,
+        user_info=request.user_info,
+        calendar_events=request.calendar_events,
+        recent_status_data=request.recent_status_data,
+    )
+    return BackendAPIResponse.model_construct(
+        success=True,
+        data=TextResponse.model_construct(text=text),
+        message="Quick create response generated"
+    )
 
 
 @router.post("/chat", response_model=BackendAPIResponse)
@@ -162,23 +138,31 @@ async def chat(
     current_user: User = Depends(get_current_user),
 ) -> BackendAPIResponse:
     """General chat endpoint."""
-    logger.debug(f"Chat request from user: {current_user.id}")
-    try:
-        text = await DashscopeService.chat(
-            prompt=request.prompt,
-            user_info=request.user_info,
-            calendar_events=request.calendar_events,
-            recent_status_data=request.recent_status_data,
-        )
-        return BackendAPIResponse(
-            success=True,
-            data=TextResponse(text=text),
-            message="Chat response generated"
-        )
-    except Exception as e:
-        logger.error(f"Chat failed: {str(e)}")
-        return BackendAPIResponse(
-            success=False,
-            data=None,
-            message=str(e)
-        )
+    logger.debug("Chat request from user: %s", current_user.id)
+    text = await DashscopeService.chat(
+        prompt=request.prompt,
+        user_info=request.user_info,
+        calendar_events=request.calendar_events,
+        recent_status_data=request.recent_status_data,
+    )
+    return BackendAPIResponse.model_construct(
+        success=True,
+        data=TextResponse.model_construct(text=text),
+        message="Chat response generated"
+    )
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    request: ChatAPIRequest,
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """General chat endpoint streaming the reply as server-sent events."""
+    logger.debug("Chat stream request from user: %s", current_user.id)
+    chunks = DashscopeService.chat_stream(
+        prompt=request.prompt,
+        user_info=request.user_info,
+        calendar_events=request.calendar_events,
+        recent_status_data=request.recent_status_data,
+    )
+    return StreamingResponse(_sse(chunks), media_type="text/event-stream")
@@ -1,22 +1,58 @@
+import functools
+from collections.abc import AsyncIterator
 from typing import Any
 
+from api.core.exceptions import DashscopeError
 from api.core.logging import get_logger
 from api.src.users.models import User
 
 logger = get_logger(__name__)
 
 
+def _wrap_errors(func):
+    """Re-raise any failure of a service call as DashscopeError."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        except DashscopeError:
+            raise
+        except Exception as e:
+            raise DashscopeError(str(e)) from e
+    return wrapper
+
+
+def _wrap_stream_errors(func):
+    """Re-raise any failure while streaming a reply as DashscopeError."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            async for chunk in func(*args, **kwargs):
+                yield chunk
+        except DashscopeError:
+            raise
+        except Exception as e:
+            raise DashscopeError(str(e)) from e
+    return wrapper
+
+
 class DashscopeService:
-    """Service for AI-related operations using Dashscope/Qwen API."""
+    """Service for AI-related operations using Dashscope/Qwen API.
+
+    Every method re-raises failures as DashscopeError, which the application
+    turns into an unsuccessful BackendAPIResponse (or an SSE error event).
+    """
 
     @staticmethod
+    @_wrap_errors
     async def get_greeting(user: User) -> str:
         """Generate a personalized greeting for the user."""
         # TODO: Integrate with actual AI service (Dashscope/Qwen)
-        logger.info(f"Generating greeting for user: {user.id}")
+        logger.info("Generating greeting for user: %s", user.id)
         return f"你好！欢迎回来。今天有什么可以帮助你的吗？"
 
     @staticmethod
+    @_wrap_errors
     async def har_analysis(
         user_info: dict[str, str],
         calendar_json: str,
@@ -25,10 +61,11 @@ class DashscopeService:
     ) -> str:
         """Perform Human Activity Recognition analysis."""
         # TODO: Integrate with actual AI service
-        logger.info(f"Performing HAR analysis with user info: {user_info}")
+        logger.info("Performing HAR analysis with user info: %s", user_info)
         return "根据您的活动数据分析，建议您适当休息，保持良好的作息规律。"
 
     @staticmethod
+    @_wrap_errors
     async def get_recommendations(
         user_info: dict[str, str],
         calendar_json: str,
@@ -37,10 +74,11 @@ class DashscopeService:
     ) -> str:
         """Get personalized recommendations."""
         # TODO: Integrate with actual AI service
-        logger.info(f"Generating recommendations for time: {time}")
+        logger.info("Generating recommendations for time: %s", time)
         return "根据您的日程和活动状态，推荐您现在可以进行一些放松活动。"
 
     @staticmethod
+    @_wrap_errors
     async def meeting_assistant(
         prompt_text: str,
         recipient_name: str,
@@ -52,10 +90,11 @@ class DashscopeService:
     ) -> str:
         """Provide meeting scheduling assistance."""
         # TODO: Integrate with actual AI service
-        logger.info(f"Meeting assistant for {requester_name} to meet {recipient_name}")
+        logger.info("Meeting assistant for %s to meet %s", requester_name, recipient_name)
         return f"建议您可以在明天下午3点与{recipient_name}安排会议，这个时间双方都有空。"
 
     @staticmethod
+    @_wrap_errors
     async def quick_create(
         prompt: str,
         user_info: dict[str, str] | None,
@@ -64,10 +103,11 @@ class DashscopeService:
     ) -> str:
         """Quick create event or task based on natural language."""
         # TODO: Integrate with actual AI service
-        logger.info(f"Quick create with prompt: {prompt[:50]}...")
+        logger.info("Quick create with prompt: %s...", prompt[:50])
         return f"已为您创建事件：{prompt}"
 
     @staticmethod
+    @_wrap_errors
     async def chat(
         prompt: str,
         user_info: dict[str, str] | None,
@@ -75,6 +115,21 @@ class DashscopeService:
         recent_status_data: list[str],
     ) -> str:
         """General chat response."""
-        # TODO: Integrate with actual AI service
-        logger.info(f"Chat with prompt: {prompt[:50]}...")
-        return f"收到您的消息：{prompt}。我会尽力帮助您！"
+        chunks = DashscopeService.chat_stream(
+            prompt, user_info, calendar_events, recent_status_data
+        )
+        return "".join([chunk async for chunk in chunks])
+
+    @staticmethod
+    @_wrap_stream_errors
+    async def chat_stream(
+        prompt: str,
+        user_info: dict[str, str] | None,
+        calendar_events: list[dict[str, Any]] | None,
+        recent_status_data: list[str],
+    ) -> AsyncIterator[str]:
+        """General chat response, yielded chunk by chunk as it is generated."""
+        # TODO: Integrate with actual AI service and yield its deltas
+        logger.info("Chat with prompt: %s...", prompt[:50])
+        yield f"收到您的消息：{prompt}。"
+        yield "我会尽力帮助您！"
@@ -1,38 +1,156 @@
-from datetime import datetime, timedelta
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import delete, select
+from sqlalchemy import (
+    Row,
+    String,
+    all_,
+    bindparam,
+    column,
+    delete,
+    exists,
+    func,
+    select,
+    table,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, Insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.src.events.models import Event
+from api.src.events.models import Event, EventSyncState, uuid7
 from api.src.events.schemas import EventCreate
 
+_UTC = timezone.utc
+
+# Columns refreshed from the client on sync conflicts
+_UPSERT_COLUMNS = (
+    "title",
+    "start_at",
+    "end_at",
+    "state",
+    "event_type",
+    "location",
+    "notes",
+    "is_all_day",
+    "timezone",
+)
+_UPSERT_BATCH_SIZE = 1000
+# Batches larger than this are turned into rows in a worker thread
+_PREPARE_IN_THREAD_THRESHOLD = 256
+# Batches larger than this are loaded with COPY through a temp table
+_COPY_THRESHOLD = 500
+_COPY_TABLE = "events_incoming"
+_COPY_COLUMNS = ("user_id", "source_event_id", *_UPSERT_COLUMNS)
+
+# Columns selected for EventResponse, skipping ORM instance hydration
+_RESPONSE_COLUMNS = (
+    Event.id,
+    Event.user_id,
+    Event.source_event_id,
+    Event.title,
+    Event.start_at,
+    Event.end_at,
+    Event.state,
+    Event.event_type,
+    Event.location,
+    Event.notes,
+    Event.is_all_day,
+    Event.timezone,
+    Event.created_at,
+    Event.updated_at,
+)
+
+
+def _prepare_rows(user_id: int, events: list[EventCreate]) -> list[dict]:
+    """Build insert rows, collapsing duplicate source IDs (last one wins)."""
+    # ON CONFLICT cannot touch the same row twice in one statement.
+    # EventCreate fields map 1:1 onto event columns; every row keeps the full
+    # column set since multi-row VALUES and COPY need a uniform shape.
+    rows = {
+        event_data.source_event_id: {"user_id": user_id, **event_data.model_dump()}
+        for event_data in events
+    }
+    return list(rows.values())
+
+
+def _on_conflict_update(stmt: Insert) -> Insert:
+    """Update changed rows on (user_id, source_event_id) conflicts."""
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        constraint="uq_events_user_source",
+        set_={
+            **{name: getattr(excluded, name) for name in _UPSERT_COLUMNS},
+            "updated_at": func.now(),
+        },
+        where=tuple_(
+            *(getattr(Event, name) for name in _UPSERT_COLUMNS)
+        ).is_distinct_from(
+            tuple_(*(getattr(excluded, name) for name in _UPSERT_COLUMNS))
+        ),
+    )
+
 
 class EventRepository:
     """Repository for event database operations."""
 
     def __init__(self, session: AsyncSession):
         self.session = session
+        # Set once a batch is loaded into the COPY temp table, which lives
+        # until the end of the current transaction
+        self._incoming_loaded = False
 
-    async def create(self, user_id: int, event_data: EventCreate) -> Event:
-        """Create a new event."""
-        event = Event(
-            user_id=user_id,
-            source_event_id=event_data.source_event_id,
-            title=event_data.title,
-            start_at=datetime.fromisoformat(event_data.start_at.replace("Z", "+00:00")),
-            end_at=datetime.fromisoformat(event_data.end_at.replace("Z", "+00:00")),
-            state=event_data.state,
-            event_type=event_data.event_type,
-            location=event_data.location,
-            notes=event_data.notes,
-            is_all_day=event_data.is_all_day,
-            timezone=event_data.timezone,
+    async def upsert_events(self, user_id: int, events: list[EventCreate]) -> int:
+        """
+        Insert or update events keyed on (user_id, source_event_id).
+        Rows whose values are unchanged are left untouched.
+        Returns count of events in the batch.
+        """
+        if not events:
+            return 0
+        if len(events) > _PREPARE_IN_THREAD_THRESHOLD:
+            # Keep the event loop responsive while large batches are prepared
+            values = await asyncio.to_thread(_prepare_rows, user_id, events)
+        else:
+            values = _prepare_rows(user_id, events)
+        if len(values) > _COPY_THRESHOLD:
+            await self._copy_upsert(values)
+            return len(values)
+        # Stay well under the 32767 bind-parameter limit of asyncpg
+        for start in range(0, len(values), _UPSERT_BATCH_SIZE):
+            stmt = pg_insert(Event).values(values[start : start + _UPSERT_BATCH_SIZE])
+            await self.session.execute(_on_conflict_update(stmt))
+        return len(values)
+
+    async def _copy_upsert(self, values: list[dict]) -> None:
+        """Stream rows into a temp table with COPY, then upsert from it."""
+        # Goes through the session so the driver transaction is open before
+        # the raw COPY below; ON COMMIT DROP ties the table to it
+        await self.session.execute(
+            text(
+                f"CREATE TEMP TABLE {_COPY_TABLE} "
+                "(LIKE events INCLUDING DEFAULTS) ON COMMIT DROP"
+            )
+        )
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            _COPY_TABLE,
+            records=[
+                (uuid7(), *(row[name] for name in _COPY_COLUMNS)) for row in values
+            ],
+            columns=("id", *_COPY_COLUMNS),
         )
-        self.session.add(event)
-        await self.session.flush()
-        return event
+        columns = ["id", *_COPY_COLUMNS]
+        incoming = table(_COPY_TABLE, *(column(name) for name in columns))
+        stmt = pg_insert(Event).from_select(columns, select(incoming))
+        await self.session.execute(_on_conflict_update(stmt))
+        self._incoming_loaded = True
 
-    async def get_by_id(self, event_id: str) -> Event | None:
+    async def get_by_id(self, event_id: uuid.UUID) -> Event | None:
         """Get event by ID."""
         result = await self.session.execute(
             select(Event).where(Event.id == event_id)
@@ -56,29 +174,49 @@ class EventRepository:
         )
         return list(result.scalars().all())
 
-    async def get_upcoming_events(self, user_id: int, days: int = 5) -> list[Event]:
-        """Get upcoming events for a user within the specified days."""
-        now = datetime.utcnow()
+    async def get_upcoming_events(self, user_id: int, days: int = 5) -> list[Row]:
+        """
+        Get upcoming events for a user within the specified days.
+        Returns plain column rows rather than ORM instances.
+        """
+        now = datetime.now(_UTC)
         future = now + timedelta(days=days)
         result = await self.session.execute(
-            select(Event).where(
+            select(*_RESPONSE_COLUMNS).where(
                 Event.user_id == user_id,
                 Event.start_at >= now,
                 Event.start_at <= future
             ).order_by(Event.start_at)
         )
-        return list(result.scalars().all())
+        return list(result.all())
 
-    async def delete_user_events(self, user_id: int) -> int:
-        """Delete all events for a user. Returns count of deleted events."""
+    async def delete_events_not_in(
+        self, user_id: int, source_event_ids: list[str]
+    ) -> int:
+        """
+        Delete user events whose source ID is not in the given list.
+        After a COPY upsert of the same batch, anti-joins the temp table;
+        otherwise the IDs are bound as a single array parameter.
+        """
+        if self._incoming_loaded:
+            self._incoming_loaded = False
+            incoming = table(_COPY_TABLE, column("source_event_id"))
+            condition = ~exists().where(
+                incoming.c.source_event_id == Event.source_event_id
+            )
+        else:
+            ids = bindparam(
+                "source_event_ids", source_event_ids, type_=ARRAY(String)
+            )
+            condition = Event.source_event_id != all_(ids)
         result = await self.session.execute(
-            delete(Event).where(Event.user_id == user_id)
+            delete(Event).where(Event.user_id == user_id, condition)
         )
         return result.rowcount
 
     async def delete_past_events(self, user_id: int) -> int:
         """Delete past events for a user. Returns count of deleted events."""
-        now = datetime.utcnow()
+        now = datetime.now(_UTC)
         result = await self.session.execute(
             delete(Event).where(
                 Event.user_id == user_id,
@@ -87,10 +225,36 @@ class EventRepository:
         )
         return result.rowcount
 
-    async def update_event_state(self, event_id: str, state: str) -> Event | None:
+    async def update_event_state(self, event_id: uuid.UUID, state: str) -> Event | None:
         """Update event state."""
-        event = await self.get_by_id(event_id)
-        if event:
-            event.state = state
-            await self.session.flush()
-        return event
+        result = await self.session.execute(
+            update(Event)
+            .where(Event.id == event_id)
+            .values(state=state)
+            .returning(Event)
+            .execution_options(synchronize_session=False)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_sync_hash(self, user_id: int) -> str | None:
+        """Get the hash of the last synced event batch for a user."""
+        result = await self.session.execute(
+            select(EventSyncState.sync_hash).where(EventSyncState.user_id == user_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def set_sync_hash(self, user_id: int, sync_hash: str) -> None:
+        """Store the hash of the last synced event batch for a user."""
+        stmt = pg_insert(EventSyncState).values(user_id=user_id, sync_hash=sync_hash)
+        await self.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[EventSyncState.user_id],
+                set_={"sync_hash": stmt.excluded.sync_hash, "updated_at": func.now()},
+            )
+        )
+
+    async def clear_sync_hash(self, user_id: int) -> None:
+        """Forget the last synced hash so the next sync is applied in full."""
+        await self.session.execute(
+            delete(EventSyncState).where(EventSyncState.user_id == user_id)
+        )
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.core.database import get_session
+from api.core.database import get_readonly_session, get_session
 from api.core.logging import get_logger
 from api.core.security import get_current_user
 from api.src.events.schemas import (
@@ -18,16 +18,29 @@ logger = get_logger(__name__)
 router = APIRouter(prefix="/events", tags=["events"])
 
 
+async def get_event_service(
+    session: AsyncSession = Depends(get_session),
+) -> EventService:
+    """Provide an EventService bound to the request session."""
+    return EventService(session)
+
+
+async def get_readonly_event_service(
+    session: AsyncSession = Depends(get_readonly_session),
+) -> EventService:
+    """Provide an EventService for read-only endpoints."""
+    return EventService(session)
+
+
 @router.post("/sync", response_model=EventSyncResponse)
 async def sync_events(
     request: EventSyncRequest,
     current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    service: EventService = Depends(get_event_service),
 ) -> EventSyncResponse:
     """Sync events from client to server."""
     logger.debug(f"Sync request from user {current_user.id} with {len(request.events)} events")
     try:
-        service = EventService(session)
         synced_count = await service.sync_events(current_user.id, request.events)
         return EventSyncResponse(
             success=True,
@@ -47,14 +60,15 @@ async def sync_events(
 async def get_upcoming_events(
     days: int = 5,
     current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    service: EventService = Depends(get_readonly_event_service),
 ) -> EventUpcomingResponse:
     """Get upcoming events for the authenticated user."""
     logger.debug(f"Upcoming events request from user {current_user.id} for {days} days")
     try:
-        service = EventService(session)
         events = await service.get_upcoming_events(current_user.id, days)
-        return EventUpcomingResponse(
+        # Events are already validated EventResponse models; the app's default
+        # ORJSONResponse serializes the result
+        return EventUpcomingResponse.model_construct(
             success=True,
             count=len(events),
             events=events,
@@ -73,12 +87,11 @@ async def get_upcoming_events(
 @router.post("/auto-sync", response_model=AutoSyncResponse)
 async def trigger_auto_sync(
     current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    service: EventService = Depends(get_event_service),
 ) -> AutoSyncResponse:
     """Trigger auto sync: update event states and cleanup past events."""
     logger.debug(f"Auto sync triggered by user {current_user.id}")
     try:
-        service = EventService(session)
         success = await service.auto_sync(current_user.id)
         return AutoSyncResponse(
             success=success,
@@ -1,4 +1,5 @@
 from datetime import datetime
+from uuid import UUID
 from pydantic import BaseModel, ConfigDict
 
 
@@ -6,8 +7,8 @@ class EventCreate(BaseModel):
     """Event creation model."""
     source_event_id: str
     title: str
-    start_at: str
-    end_at: str
+    start_at: datetime
+    end_at: datetime
     state: str
     event_type: str | None = None
     location: str | None = None
@@ -32,20 +33,20 @@ class EventResponse(BaseModel):
     """Event response model."""
     model_config = ConfigDict(from_attributes=True)
 
-    id: str
+    id: UUID
     user_id: int
     source_event_id: str
     title: str
-    start_at: str
-    end_at: str
+    start_at: datetime
+    end_at: datetime
     state: str
     event_type: str | None = None
     location: str | None = None
     notes: str | None = None
     is_all_day: bool | None = None
     timezone: str | None = None
-    created_at: str
-    updated_at: str
+    created_at: datetime
+    updated_at: datetime
 
 
 class EventUpcomingResponse(BaseModel):
@@ -1,3 +1,6 @@
+import hashlib
+
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.core.logging import get_logger
@@ -7,6 +10,19 @@ from api.src.events.schemas import EventCreate, EventResponse
 
 logger = get_logger(__name__)
 
+# Timestamps stay datetime; pydantic-core renders ISO 8601 on serialization
+_RESPONSE_FIELDS = tuple(EventResponse.model_fields)
+
+
+def _compute_sync_hash(events: list[EventCreate]) -> str:
+    """Hash an event batch independent of the order events were sent in."""
+    digest = hashlib.blake2b(digest_size=16)
+    # Stable sort keeps the relative order of duplicate source IDs
+    for event in sorted(events, key=lambda e: e.source_event_id):
+        digest.update(event.model_dump_json().encode())
+        digest.update(b"\n")
+    return digest.hexdigest()
+
 
 class EventService:
     """Service for event business logic."""
@@ -17,20 +33,28 @@ class EventService:
 
     async def sync_events(self, user_id: int, events: list[EventCreate]) -> int:
         """
-        Sync events for a user using delete-then-add strategy.
+        Sync events for a user by upserting the incoming events and
+        deleting any the client no longer has, in one transaction.
         Returns the count of synced events.
         """
-        # Delete existing events for the user
-        deleted_count = await self.repository.delete_user_events(user_id)
-        logger.info(f"Deleted {deleted_count} existing events for user {user_id}")
+        sync_hash = _compute_sync_hash(events)
+        async with self.session.begin():
+            # Clients often resend an unchanged list; skip all writes then
+            if await self.repository.get_sync_hash(user_id) == sync_hash:
+                synced_count = len({event.source_event_id for event in events})
+                logger.info(f"Events unchanged for user {user_id}, skipping sync")
+                return synced_count
 
-        # Create new events
-        for event_data in events:
-            await self.repository.create(user_id, event_data)
+            synced_count = await self.repository.upsert_events(user_id, events)
 
-        await self.session.commit()
-        logger.info(f"Synced {len(events)} events for user {user_id}")
-        return len(events)
+            # Remove events that are no longer present on the client
+            deleted_count = await self.repository.delete_events_not_in(
+                user_id, [event.source_event_id for event in events]
+            )
+            await self.repository.set_sync_hash(user_id, sync_hash)
+        logger.info(f"Deleted {deleted_count} stale events for user {user_id}")
+        logger.info(f"Synced {synced_count} events for user {user_id}")
+        return synced_count
 
     async def get_upcoming_events(self, user_id: int, days: int = 5) -> list[EventResponse]:
         """Get upcoming events for a user."""
@@ -44,25 +68,15 @@ class EventService:
         # Clean up past events
         deleted_count = await self.repository.delete_past_events(user_id)
         logger.info(f"Auto sync: cleaned up {deleted_count} past events for user {user_id}")
+        if deleted_count:
+            # Stored events no longer match the last synced batch
+            await self.repository.clear_sync_hash(user_id)
 
         await self.session.commit()
         return True
 
-    def _to_response(self, event: Event) -> EventResponse:
-        """Convert Event model to EventResponse."""
-        return EventResponse(
-            id=event.id,
-            user_id=event.user_id,
-            source_event_id=event.source_event_id,
-            title=event.title,
-            start_at=event.start_at.isoformat(),
-            end_at=event.end_at.isoformat(),
-            state=event.state,
-            event_type=event.event_type,
-            location=event.location,
-            notes=event.notes,
-            is_all_day=event.is_all_day,
-            timezone=event.timezone,
-            created_at=event.created_at.isoformat(),
-            updated_at=event.updated_at.isoformat(),
+    def _to_response(self, event: Event | Row) -> EventResponse:
+        """Convert an Event or event row to EventResponse without re-validating."""
+        return EventResponse.model_construct(
+            **{name: getattr(event, name) for name in _RESPONSE_FIELDS}
         )
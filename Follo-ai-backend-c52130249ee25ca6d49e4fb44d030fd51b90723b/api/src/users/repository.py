@@ -1,4 +1,7 @@
-from sqlalchemy import select
+from cachetools import TTLCache
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.core.exceptions import AlreadyExistsException, NotFoundException
@@ -9,6 +12,19 @@ from api.src.users.schemas import UserCreate
 
 logger = get_logger(__name__)
 
+# Recent "not found" answers for the check-email / check-apple probes.
+# Entries are dropped as soon as a matching user is created or linked.
+_missing_emails: TTLCache[str, bool] = TTLCache(maxsize=10_000, ttl=30)
+_missing_apple_ids: TTLCache[str, bool] = TTLCache(maxsize=10_000, ttl=30)
+
+
+def forget_missing(email: str | None = None, apple_id: str | None = None) -> None:
+    """Drop cached negative lookups for an email and/or Apple ID."""
+    if email:
+        _missing_emails.pop(email, None)
+    if apple_id:
+        _missing_apple_ids.pop(apple_id, None)
+
 
 class UserRepository:
     """Repository for handling user database operations."""
@@ -35,11 +51,15 @@ class UserRepository:
 
         # Create user
         user = User(
-            email=user_data.email, hashed_password=get_password_hash(user_data.password)
+            email=user_data.email,
+            hashed_password=get_password_hash(user_data.password),
+            apple_id=None,
         )
         self.session.add(user)
+        # Every column is set or returned by the INSERT and sessions keep
+        # attributes on commit, so no refresh SELECT is needed
         await self.session.commit()
-        await self.session.refresh(user)
+        forget_missing(email=user.email)
 
         logger.info(f"Created user: {user.email}")
         return user
@@ -65,6 +85,25 @@ class UserRepository:
 
         return user
 
+    async def get_active_flag(self, user_id: int) -> bool | None:
+        """Get only the is_active flag of a user.
+
+        The column is nullable; a NULL flag counts as inactive, as it did
+        when the full user was checked with ``not user.is_active``.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Optional[bool]: Active flag or None if user not found
+        """
+        query = select(User.is_active).where(User.id == user_id)
+        result = await self.session.execute(query)
+        row = result.one_or_none()
+        if row is None:
+            return None
+        return bool(row.is_active)
+
     async def get_by_email(self, email: str) -> User | None:
         """Get user by email.
 
@@ -78,6 +117,42 @@ class UserRepository:
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
+    async def find_by_email_cached(self, email: str) -> User | None:
+        """Get user by email, remembering misses for a short time.
+
+        Only meant for existence probes; write paths must use get_by_email.
+
+        Args:
+            email: User email
+
+        Returns:
+            Optional[User]: Found user or None if not found
+        """
+        if email in _missing_emails:
+            return None
+        user = await self.get_by_email(email)
+        if user is None:
+            _missing_emails[email] = True
+        return user
+
+    async def find_by_apple_id_cached(self, apple_id: str) -> User | None:
+        """Get user by Apple ID, remembering misses for a short time.
+
+        Only meant for existence probes; write paths must use get_by_apple_id.
+
+        Args:
+            apple_id: Apple user ID (sub)
+
+        Returns:
+            Optional[User]: Found user or None if not found
+        """
+        if apple_id in _missing_apple_ids:
+            return None
+        user = await self.get_by_apple_id(apple_id)
+        if user is None:
+            _missing_apple_ids[apple_id] = True
+        return user
+
     async def get_by_apple_id(self, apple_id: str) -> User | None:
         """Get user by Apple ID.
 
@@ -91,47 +166,40 @@ class UserRepository:
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
-    async def create_apple_user(
-        self, email: str | None, apple_id: str, is_active: bool = True
-    ) -> User:
-        """Create user via Apple Sign In.
+    async def upsert_apple_user(self, apple_id: str, email: str | None) -> User:
+        """Get or create a user by Apple ID in a single statement.
+
+        New users are created active without a password. For existing users
+        the email is replaced when Apple sends one and kept otherwise.
 
         Args:
+            apple_id: Apple user ID (sub)
             email: User email (from Apple) - can be None
-            apple_id: Apple user ID
-            is_active: User active status
 
         Returns:
-            User: Created user
+            User: Created or existing user
 
         Raises:
-            AlreadyExistsException: If Apple ID or email already exists
+            AlreadyExistsException: If the email belongs to another account
         """
-        # 检查 Apple ID 是否存在
-        existing_apple_user = await self.get_by_apple_id(apple_id)
-        if existing_apple_user:
-            raise AlreadyExistsException("Apple ID already registered")
-
-        # 检查邮箱是否已存在（仅当email不为None时）
-        if email:
-            existing_email_user = await self.get_by_email(email)
-            if existing_email_user:
-                raise AlreadyExistsException("Email already registered")
-
-        # 创建用户
-        user = User(
-            email=email,
-            apple_id=apple_id,
-            hashed_password=None,  # Apple 登录用户没有密码
-            is_active=is_active,
+        stmt = pg_insert(User).values(
+            email=email, apple_id=apple_id, hashed_password=None, is_active=True
         )
-        self.session.add(user)
-        await self.session.commit()
-        await self.session.refresh(user)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[User.apple_id],
+            set_={"email": func.coalesce(stmt.excluded.email, User.email)},
+        ).returning(User)
+        try:
+            result = await self.session.scalars(
+                stmt, execution_options={"populate_existing": True}
+            )
+            user = result.one()
+            await self.session.commit()
+        except IntegrityError:
+            await self.session.rollback()
+            raise AlreadyExistsException("Email already registered")
+        forget_missing(email=user.email, apple_id=apple_id)
 
-        logger.info(
-            f"Created Apple user: {user.email or 'No email'}, Apple ID: {user.apple_id}"
-        )
         return user
 
     async def link_apple_account(self, user_id: int, apple_id: str) -> User:
@@ -145,21 +213,37 @@ class UserRepository:
             User: Updated user
 
         Raises:
-            AlreadyExistsException: If Apple ID is already linked
+            AlreadyExistsException: If the Apple ID or the account is already
+                linked elsewhere
             NotFoundException: If user not found
         """
-        # 检查 Apple ID 是否已被使用
-        existing_apple_user = await self.get_by_apple_id(apple_id)
-        if existing_apple_user:
+        # 一条 UPDATE 完成检查和关联；重复关联同一个 Apple ID 视为成功
+        stmt = (
+            update(User)
+            .where(
+                User.id == user_id,
+                or_(User.apple_id.is_(None), User.apple_id == apple_id),
+            )
+            .values(apple_id=apple_id)
+            .returning(User)
+        )
+        try:
+            result = await self.session.scalars(
+                stmt, execution_options={"populate_existing": True}
+            )
+            user = result.one_or_none()
+        except IntegrityError:
+            await self.session.rollback()
             raise AlreadyExistsException("Apple ID already linked to another account")
+        if user is None:
+            await self.session.rollback()
+            # 没有行被更新：用户不存在，或已关联了其他 Apple ID
+            if await self.session.get(User, user_id) is None:
+                raise NotFoundException("User not found")
+            raise AlreadyExistsException("Account already linked to another Apple ID")
 
-        # 获取用户
-        user = await self.get_by_id(user_id)
-
-        # 更新 Apple ID
-        user.apple_id = apple_id
         await self.session.commit()
-        await self.session.refresh(user)
+        forget_missing(apple_id=apple_id)
 
         logger.info(f"Linked Apple account: User ID {user.id}, Apple ID {apple_id}")
         return user
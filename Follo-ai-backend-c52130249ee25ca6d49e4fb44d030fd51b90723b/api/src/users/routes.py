@@ -89,7 +89,7 @@ async def check_apple_id(
 ) -> dict:
     """Check if an Apple ID is already linked to an account."""
     user_service = UserService(session)
-    user = await user_service.repository.get_by_apple_id(apple_id)
+    user = await user_service.repository.find_by_apple_id_cached(apple_id)
     return {"is_linked": user is not None, "user_id": user.id if user else None}
 
 
@@ -97,5 +97,5 @@ async def check_apple_id(
 async def check_email(email: str, session: AsyncSession = Depends(get_session)) -> dict:
     """Check if an email is already registered."""
     user_service = UserService(session)
-    user = await user_service.repository.get_by_email(email)
+    user = await user_service.repository.find_by_email_cached(email)
     return {"is_registered": user is not None, "user_id": user.id if user else None}
@@ -1,28 +1,52 @@
-from datetime import timedelta
+import asyncio
+import hashlib
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.core.apple_oauth import apple_oauth
-from api.core.config import settings
 from api.core.exceptions import UnauthorizedException
 from api.core.logging import get_logger
-from api.core.security import (
-    create_access_token,
-    create_refresh_token,
-    verify_password,
-    verify_refresh_token,
-)
+from api.core.security import create_token_pair, verify_password, verify_refresh_token
 from api.src.users.models import User
 from api.src.users.repository import UserRepository
 from api.src.users.schemas import AppleLoginRequest, LoginData, Token, UserCreate
 
 logger = get_logger(__name__)
 
+# bcrypt hash of a random throwaway password, same cost as real hashes. Checked
+# when no account matches so unknown emails take as long as wrong passwords.
+_DUMMY_HASH = "$2b$12$1LPtnTI1z30OgiVoiZVv/e5W9Y40NlfBxZSJ6MXZc8Jox04n2BO.q"
+
+# Refreshes currently running, keyed by a digest of the refresh token. Clients
+# that retry concurrently with the same token share one result.
+_inflight_refreshes: dict[bytes, asyncio.Future[Token]] = {}
+
+
+def _require_apple_id(apple_user_info: dict) -> str:
+    """Return the Apple ID (id_token sub), rejecting tokens without one.
+
+    A missing sub would otherwise be stored as NULL, which never conflicts on
+    the apple_id index and would create a new account on every login.
+    """
+    apple_id = apple_user_info.get("apple_id")
+    if not isinstance(apple_id, str) or not apple_id:
+        raise UnauthorizedException(detail="Invalid Apple authorization code")
+    return apple_id
+
+
+def _issue_tokens(user_id: str) -> Token:
+    """Create the access/refresh token pair returned by every login path."""
+    access_token, refresh_token = create_token_pair(user_id)
+    # Both strings come from our own signer, so skip validation
+    return Token.model_construct(access_token=access_token, refresh_token=refresh_token)
+
 
 class UserService:
     """Service for handling user business logic."""
 
     def __init__(self, session: AsyncSession):
+        # The request session is not wrapped in begin(); each write is one
+        # repository call that commits its own transaction
         self.session = session
         self.repository = UserRepository(session)
 
@@ -35,21 +59,18 @@ class UserService:
         # Get user
         user = await self.repository.get_by_email(login_data.email)
 
-        # Verify credentials
-        if not user or not verify_password(
-            login_data.password, str(user.hashed_password)
+        # Verify credentials, running bcrypt even when the user does not exist
+        # or has no password (Apple-only accounts)
+        if user is None:
+            verify_password(login_data.password, _DUMMY_HASH)
+            raise UnauthorizedException(detail="Incorrect email or password")
+        if not verify_password(
+            login_data.password, user.hashed_password or _DUMMY_HASH
         ):
             raise UnauthorizedException(detail="Incorrect email or password")
 
-        # Create access token and refresh token
-        access_token = create_access_token(
-            data={"sub": str(user.id)},
-            expires_delta=timedelta(minutes=settings.JWT_EXPIRATION),
-        )
-        refresh_token = create_refresh_token(data={"sub": str(user.id)})
-
-        logger.info(f"User authenticated: {user.email}")
-        return Token(access_token=access_token, refresh_token=refresh_token)
+        logger.info("User authenticated: %s", user.email)
+        return _issue_tokens(str(user.id))
 
     async def authenticate_with_apple(self, apple_data: AppleLoginRequest) -> Token:
         """Authenticate user via Apple Sign In."""
@@ -61,42 +82,20 @@ class UserService:
         if not apple_user_info:
             raise UnauthorizedException(detail="Invalid Apple authorization code")
 
-        apple_id = apple_user_info["apple_id"]
+        apple_id = _require_apple_id(apple_user_info)
         email = apple_user_info.get("email")
 
-        # 查找是否已有使用此 Apple ID 的用户
-        user = await self.repository.get_by_apple_id(apple_id)
-
-        if user:
-            # 用户已存在，更新邮箱（如果需要）
-            if email and user.email != email:
-                user.email = email
-                await self.session.commit()
-
-            logger.info(f"Apple user authenticated: {user.email}")
-        else:
-            # 新用户，创建账户
-            # Apple Sign In 允许没有邮箱的账户（Apple ID 作为唯一标识）
-            user = await self.repository.create_apple_user(
-                email=email,  # 可以为 None
-                apple_id=apple_id,
-                is_active=True,
-            )
-
-            logger.info(f"New Apple user created: {user.email or 'No email provided'}")
+        # 一条 INSERT ... ON CONFLICT 完成查找、创建和邮箱更新
+        # Apple Sign In 允许没有邮箱的账户（Apple ID 作为唯一标识）
+        user = await self.repository.upsert_apple_user(apple_id=apple_id, email=email)
+        logger.info("Apple user authenticated: %s", user.email or "No email provided")
 
         # 检查用户是否被禁用
         if not user.is_active:
             raise UnauthorizedException(detail="User account is disabled")
 
         # 创建访问令牌和刷新令牌
-        access_token = create_access_token(
-            data={"sub": str(user.id)},
-            expires_delta=timedelta(minutes=settings.JWT_EXPIRATION),
-        )
-        refresh_token = create_refresh_token(data={"sub": str(user.id)})
-
-        return Token(access_token=access_token, refresh_token=refresh_token)
+        return _issue_tokens(str(user.id))
 
     async def link_apple_account(
         self, user_id: int, apple_data: AppleLoginRequest
@@ -110,12 +109,12 @@ class UserService:
         if not apple_user_info:
             raise UnauthorizedException(detail="Invalid Apple authorization code")
 
-        apple_id = apple_user_info["apple_id"]
+        apple_id = _require_apple_id(apple_user_info)
 
         # 关联 Apple 账户
         user = await self.repository.link_apple_account(user_id, apple_id)
 
-        logger.info(f"Apple account linked: User ID {user.id}")
+        logger.info("Apple account linked: User ID %s", user.id)
         return user
 
     async def get_user(self, user_id: int) -> User:
@@ -124,6 +123,35 @@ class UserService:
 
     async def refresh_tokens(self, refresh_token_str: str) -> Token:
         """Refresh access token using refresh token."""
+        key = hashlib.blake2b(refresh_token_str.encode(), digest_size=16).digest()
+        inflight = _inflight_refreshes.get(key)
+        if inflight is not None:
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # The refresh we joined was cancelled, not us; do it ourselves
+                if not inflight.cancelled():
+                    raise
+            return await self._refresh_tokens(refresh_token_str)
+
+        future = asyncio.get_running_loop().create_future()
+        _inflight_refreshes[key] = future
+        try:
+            token = await self._refresh_tokens(refresh_token_str)
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # nobody may be waiting; don't log it as unretrieved
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        else:
+            future.set_result(token)
+            return token
+        finally:
+            _inflight_refreshes.pop(key, None)
+
+    async def _refresh_tokens(self, refresh_token_str: str) -> Token:
         payload = verify_refresh_token(refresh_token_str)
         if not payload:
             raise UnauthorizedException(detail="Invalid refresh token")
@@ -132,20 +160,13 @@ class UserService:
         if not user_id:
             raise UnauthorizedException(detail="Invalid refresh token")
 
-        # Verify user exists
-        user = await self.repository.get_by_id(int(user_id))
-        if not user:
+        # Verify user exists and is active, loading only the flag
+        is_active = await self.repository.get_active_flag(int(user_id))
+        if is_active is None:
             raise UnauthorizedException(detail="User not found")
 
-        if not user.is_active:
+        if not is_active:
             raise UnauthorizedException(detail="User account is disabled")
 
-        # Create new tokens
-        access_token = create_access_token(
-            data={"sub": str(user.id)},
-            expires_delta=timedelta(minutes=settings.JWT_EXPIRATION),
-        )
-        new_refresh_token = create_refresh_token(data={"sub": str(user.id)})
-
-        logger.info(f"Tokens refreshed for user: {user.id}")
-        return Token(access_token=access_token, refresh_token=new_refresh_token)
+        logger.info("Tokens refreshed for user: %s", user_id)
+        return _issue_tokens(user_id)
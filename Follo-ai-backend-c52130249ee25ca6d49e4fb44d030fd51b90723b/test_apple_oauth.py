@@ -62,15 +62,11 @@ def test_private_key():
             else:
                 print(f"   ⚠️  曲线类型不是 P-256: {curve.name}")
 
-            # 获取公钥
-            public_key = private_key.public_key()
-            print(f"   ✅ 私钥可以生成公钥")
-
-            # 获取编码长度
-            private_bytes = private_key.private_numbers().private_value.to_bytes(
-                32, "big"
-            )
-            print(f"   ✅ 私钥编码长度: 32 字节 (256 bits)")
+            # 密钥长度直接取自已解析的曲线，无需推导公钥
+            if private_key.key_size == 256:
+                print("   ✅ 私钥长度: 256 bits")
+            else:
+                print(f"   ⚠️  私钥长度不是 256 bits: {private_key.key_size}")
 
         else:
             print(f"   ⚠️  不是 EC 私钥，而是 {type(private_key).__name__}")
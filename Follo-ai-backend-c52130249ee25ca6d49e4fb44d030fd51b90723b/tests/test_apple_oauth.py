@@ -0,0 +1,161 @@
+"""测试 Apple OAuth 服务的 client secret 生成"""
+
+import asyncio
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from jose import jwt
+
+from api.core.apple_oauth import (
+    CLIENT_SECRET_REFRESH_MARGIN,
+    AppleOAuthService,
+    _UnconfiguredAppleOAuthService,
+)
+from api.core.config import settings
+
+
+@pytest.fixture
+async def apple_service(monkeypatch):
+    """使用临时生成的 EC 私钥构造 Apple OAuth 服务，测试结束后关闭其 HTTP 客户端"""
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    ).decode("utf-8")
+
+    monkeypatch.setattr(settings, "APPLE_CLIENT_ID", "com.example.app")
+    monkeypatch.setattr(settings, "APPLE_TEAM_ID", "TEAMID")
+    monkeypatch.setattr(settings, "APPLE_KEY_ID", "KEYID")
+    monkeypatch.setattr(settings, "APPLE_PRIVATE_KEY", pem)
+    service = AppleOAuthService.from_settings()
+    # 测试可能用 monkeypatch 替换 _http，这里关闭服务自己创建的客户端
+    http = service._http
+    yield service
+    await http.aclose()
+
+
+def test_client_secret_claims(apple_service):
+    """测试 client secret 的 header 和 payload"""
+    client_secret = apple_service._create_client_secret()
+
+    header = jwt.get_unverified_header(client_secret)
+    claims = jwt.get_unverified_claims(client_secret)
+
+    assert header["alg"] == "ES256"
+    assert header["kid"] == "KEYID"
+    assert claims["iss"] == "TEAMID"
+    assert claims["sub"] == "com.example.app"
+    assert claims["aud"] == "https://appleid.apple.com"
+    # Apple 拒绝有效期超过 6 个月的 client secret
+    assert claims["exp"] - claims["iat"] <= 15777000
+
+
+def test_private_key_parsed_once(apple_service):
+    """测试私钥在初始化时被解析为密钥对象"""
+    assert isinstance(apple_service._signing_key, ec.EllipticCurvePrivateKey)
+
+
+def test_client_secret_is_cached(apple_service):
+    """测试 client secret 在有效期内被复用"""
+    first = apple_service._create_client_secret()
+    second = apple_service._create_client_secret()
+
+    assert first is second
+
+
+def test_client_secret_regenerated_near_expiry(apple_service):
+    """测试 client secret 临近过期时重新签名"""
+    first = apple_service._create_client_secret()
+    apple_service._cached_exp = (
+        jwt.get_unverified_claims(first)["iat"] + CLIENT_SECRET_REFRESH_MARGIN
+    )
+
+    second = apple_service._create_client_secret()
+
+    assert second is not first
+    assert apple_service._cached_secret == second
+
+
+async def test_concurrent_cache_miss_signs_once(apple_service, monkeypatch):
+    """测试缓存失效时并发请求只签名一次"""
+    signed = []
+    create_client_secret = apple_service._create_client_secret
+
+    def counting_create():
+        signed.append(1)
+        return create_client_secret()
+
+    monkeypatch.setattr(apple_service, "_create_client_secret", counting_create)
+
+    secrets = await asyncio.gather(
+        *(apple_service._get_client_secret() for _ in range(5))
+    )
+
+    assert len(signed) == 1
+    assert len(set(secrets)) == 1
+
+
+async def test_verify_authorization_code(apple_service, monkeypatch):
+    """测试授权码换取 token 并解析 id_token"""
+    id_token = jwt.encode(
+        {"sub": "001234.apple", "email": "user@privaterelay.appleid.com"},
+        "secret",
+        algorithm="HS256",
+    )
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(
+            200,
+            json={
+                "id_token": id_token,
+                "access_token": "apple-access",
+                "refresh_token": "apple-refresh",
+            },
+        )
+
+    async with httpx.AsyncClient(
+        base_url="https://appleid.apple.com", transport=httpx.MockTransport(handler)
+    ) as http:
+        monkeypatch.setattr(apple_service, "_http", http)
+        result = await apple_service.verify_authorization_code("auth-code")
+
+    assert requests[0].url == "https://appleid.apple.com/auth/token"
+    assert result["apple_id"] == "001234.apple"
+    assert result["email"] == "user@privaterelay.appleid.com"
+    assert result["refresh_token"] == "apple-refresh"
+
+
+async def test_verify_authorization_code_rejects_malformed_id_token(
+    apple_service, monkeypatch
+):
+    """测试 id_token 格式错误时返回 None"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"id_token": "not-a-jwt"})
+
+    async with httpx.AsyncClient(
+        base_url="https://appleid.apple.com", transport=httpx.MockTransport(handler)
+    ) as http:
+        monkeypatch.setattr(apple_service, "_http", http)
+        result = await apple_service.verify_authorization_code("auth-code")
+
+    assert result is None
+
+
+async def test_unconfigured_service_rejects_requests(monkeypatch):
+    """测试未配置时拒绝 Apple 请求，且不创建 HTTP 客户端"""
+    monkeypatch.setattr(settings, "APPLE_PRIVATE_KEY", None)
+    service = AppleOAuthService.from_settings()
+
+    assert isinstance(service, _UnconfiguredAppleOAuthService)
+
+    assert service.is_configured is False
+    with pytest.raises(ValueError):
+        await service.verify_authorization_code("auth-code")
+    with pytest.raises(ValueError):
+        await service.refresh_access_token("refresh-token")
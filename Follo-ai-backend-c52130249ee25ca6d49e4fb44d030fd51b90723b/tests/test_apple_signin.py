@@ -149,30 +149,62 @@ def test_user_repository_get_by_apple_id(async_session):
 
 
 @pytest.mark.asyncio
-async def test_user_repository_create_apple_user(async_session):
-    """测试用户仓库创建 Apple 用户"""
+async def test_user_repository_upsert_apple_user():
+    """测试用户仓库用一条 ON CONFLICT 语句按 Apple ID 创建或更新用户"""
+    from sqlalchemy.dialects import postgresql
+    from sqlalchemy.exc import IntegrityError
+
     from api.core.exceptions import AlreadyExistsException
     from api.src.users.repository import UserRepository
 
-    repository = UserRepository(async_session)
+    class Result:
+        def one(self):
+            return User(id=1, email="apple@example.com", apple_id="com.apple.test.id")
 
-    # 创建 Apple 用户
-    user = await repository.create_apple_user(
-        email="apple@example.com",
+    class Session:
+        def __init__(self, error=None):
+            self.error = error
+            self.statements = []
+            self.committed = False
+            self.rolled_back = False
+
+        async def scalars(self, stmt, execution_options=None):
+            self.statements.append(stmt)
+            if self.error:
+                raise self.error
+            return Result()
+
+        async def commit(self):
+            self.committed = True
+
+        async def rollback(self):
+            self.rolled_back = True
+
+    session = Session()
+    user = await UserRepository(session).upsert_apple_user(
         apple_id="com.apple.test.id",
+        email=None,
     )
 
-    assert user.email == "apple@example.com"
     assert user.apple_id == "com.apple.test.id"
-    assert user.hashed_password is None
-    assert user.is_active is True
-
-    # 尝试创建重复的 Apple ID
+    assert session.committed is True
+    sql = " ".join(
+        str(session.statements[0].compile(dialect=postgresql.dialect())).split()
+    )
+    # 未提供邮箱时保留原邮箱
+    assert (
+        "ON CONFLICT (apple_id) DO UPDATE SET "
+        "email = coalesce(excluded.email, users.email) RETURNING"
+    ) in sql
+
+    # 邮箱已被其他账户使用
+    session = Session(error=IntegrityError("INSERT", {}, Exception("email")))
     with pytest.raises(AlreadyExistsException):
-        await repository.create_apple_user(
-            email="different@example.com",
-            apple_id="com.apple.test.id",
+        await UserRepository(session).upsert_apple_user(
+            apple_id="com.apple.other.id",
+            email="apple@example.com",
         )
+    assert session.rolled_back is True
 
 
 @pytest.mark.asyncio
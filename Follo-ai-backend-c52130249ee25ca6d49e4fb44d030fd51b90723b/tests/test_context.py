@@ -0,0 +1,93 @@
+from fastapi.testclient import TestClient
+
+from api.core.security import get_current_user
+from api.main import app
+from api.src.context.schemas import CalendarEvent, ContextSnapshot, HealthData
+from api.src.context.service import ContextService
+from api.src.users.models import User
+
+client = TestClient(app)
+
+user = User(id=1, email="test@example.com", is_active=True)
+
+
+def make_snapshot(**kwargs) -> ContextSnapshot:
+    return ContextSnapshot(timestamp="2026-01-11T09:00:00Z", **kwargs)
+
+
+def test_location_change_with_event_notifies():
+    snapshot = make_snapshot(
+        calendar_events=[
+            CalendarEvent(
+                title="Standup",
+                start="2026-01-11T09:15:00Z",
+                end="2026-01-11T09:30:00Z",
+            )
+        ]
+    )
+
+    response = ContextService.process_context(user, "location_change", snapshot)
+
+    assert response.decision == "notify"
+    assert response.notification.priority == "normal"
+    assert response.notification.body == "您的活动 'Standup' 即将开始"
+    assert response.model_dump()["notification"]["action_label"] == "查看详情"
+
+
+def test_time_based_without_events_takes_no_action():
+    response = ContextService.process_context(user, "time_based", make_snapshot())
+
+    assert response.decision == "no_action"
+    assert response.notification is None
+
+
+def test_health_alert_notifies():
+    snapshot = make_snapshot(health=HealthData(heart_rate=120.0))
+
+    response = ContextService.process_context(user, "health_alert", snapshot)
+
+    assert response.decision == "notify"
+    assert response.notification.title == "健康提醒"
+
+
+def test_unknown_trigger():
+    response = ContextService.process_context(user, "bogus", make_snapshot())
+
+    assert response.decision == "no_action"
+    assert response.reasoning == "Unknown trigger type: bogus"
+
+
+def test_context_engine_parses_raw_body():
+    app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        response = client.post(
+            "/api/v1/context/engine",
+            json={
+                "trigger": "health_alert",
+                "snapshot": {
+                    "timestamp": "2026-01-11T09:00:00Z",
+                    "health": {"heart_rate": 120.0},
+                },
+            },
+        )
+        invalid = client.post(
+            "/api/v1/context/engine", json={"trigger": "health_alert"}
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json()["decision"] == "notify"
+    assert invalid.status_code == 422
+    assert invalid.json()["detail"][0]["loc"] == ["body", "snapshot"]
+
+
+def test_context_engine_request_body_is_documented():
+    openapi = app.openapi()
+    operation = openapi["paths"]["/api/v1/context/engine"]["post"]
+    body = operation["requestBody"]["content"]["application/json"]["schema"]
+    components = openapi["components"]["schemas"]
+
+    assert body == {"$ref": "#/components/schemas/ContextEngineRequest"}
+    assert components["ContextEngineRequest"]["required"] == ["trigger", "snapshot"]
+    assert "timestamp" in components["ContextSnapshot"]["properties"]
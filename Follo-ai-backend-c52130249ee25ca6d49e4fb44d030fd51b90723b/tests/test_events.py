@@ -0,0 +1,155 @@
+from datetime import datetime, timezone
+from uuid import UUID
+
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from api.core.security import get_current_user
+from api.main import app
+from api.src.events.models import Event, uuid7
+from api.src.events.repository import EventRepository, _prepare_rows
+from api.src.events.routes import get_readonly_event_service
+from api.src.events.schemas import EventCreate, EventUpcomingResponse
+from api.src.events.service import EventService, _compute_sync_hash
+from api.src.users.models import User
+
+client = TestClient(app)
+
+start = datetime(2026, 1, 11, 9, 15, tzinfo=timezone.utc)
+end = datetime(2026, 1, 11, 9, 30, tzinfo=timezone.utc)
+
+
+def make_event(**kwargs) -> Event:
+    return Event(
+        id=UUID("01944c1a-7b00-7000-8000-000000000001"),
+        user_id=1,
+        source_event_id="src-1",
+        title="Standup",
+        start_at=start,
+        end_at=end,
+        state="pending",
+        created_at=start,
+        updated_at=start,
+        **kwargs,
+    )
+
+
+def test_event_response_serializes_iso_timestamps():
+    response = EventService(session=None)._to_response(make_event())
+
+    body = EventUpcomingResponse(success=True, count=1, events=[response]).model_dump(
+        mode="json"
+    )
+
+    event = body["events"][0]
+    assert event["id"] == "01944c1a-7b00-7000-8000-000000000001"
+    assert event["start_at"] == "2026-01-11T09:15:00Z"
+    assert event["end_at"] == "2026-01-11T09:30:00Z"
+    assert event["created_at"] == "2026-01-11T09:15:00Z"
+    assert event["location"] is None
+
+
+def test_event_create_parses_utc_suffix():
+    event = EventCreate(
+        source_event_id="src-1",
+        title="Standup",
+        start_at="2026-01-11T09:15:00Z",
+        end_at="2026-01-11T09:30:00.500+08:00",
+        state="pending",
+    )
+
+    assert event.start_at == start
+    assert event.end_at.utcoffset().total_seconds() == 8 * 3600
+
+
+def test_sync_hash_ignores_order_but_not_content():
+    first = EventCreate(
+        source_event_id="src-1",
+        title="Standup",
+        start_at=start,
+        end_at=end,
+        state="pending",
+    )
+    second = first.model_copy(update={"source_event_id": "src-2"})
+    moved = second.model_copy(update={"location": "Room 1"})
+
+    assert _compute_sync_hash([first, second]) == _compute_sync_hash([second, first])
+    assert _compute_sync_hash([first, second]) != _compute_sync_hash([first, moved])
+
+
+def test_upcoming_events_route_serializes_events():
+    class FakeService:
+        async def get_upcoming_events(self, user_id, days):
+            return [EventService(session=None)._to_response(make_event())]
+
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, is_active=True)
+    app.dependency_overrides[get_readonly_event_service] = lambda: FakeService()
+    try:
+        response = client.get("/api/v1/events/upcoming")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["success"] is True
+    assert body["count"] == 1
+    assert body["events"][0]["start_at"] == "2026-01-11T09:15:00Z"
+
+
+def test_uuid7_is_time_ordered_version_7():
+    first = uuid7()
+    second = uuid7()
+
+    assert first.version == 7
+    assert first.int >> 80 <= second.int >> 80
+
+
+def test_prepare_rows_keeps_last_duplicate():
+    first = EventCreate(
+        source_event_id="src-1",
+        title="Standup",
+        start_at=start,
+        end_at=end,
+        state="pending",
+    )
+    renamed = first.model_copy(update={"title": "Daily standup"})
+
+    rows = _prepare_rows(7, [first, renamed])
+
+    assert len(rows) == 1
+    assert rows[0]["user_id"] == 7
+    assert rows[0]["title"] == "Daily standup"
+    assert rows[0]["location"] is None
+
+
+class _RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt.compile(dialect=postgresql.dialect()))
+        return type("Result", (), {"rowcount": 0})()
+
+
+async def test_delete_events_not_in_binds_ids_as_one_array():
+    session = _RecordingSession()
+    repository = EventRepository(session)
+
+    await repository.delete_events_not_in(1, ["a", "b", "c"])
+    await repository.delete_events_not_in(1, ["a"])
+
+    first, second = session.statements
+    assert "!= ALL" in str(first) and str(first) == str(second)
+    assert first.params["source_event_ids"] == ["a", "b", "c"]
+
+
+async def test_delete_events_not_in_anti_joins_after_copy():
+    session = _RecordingSession()
+    repository = EventRepository(session)
+    repository._incoming_loaded = True
+
+    await repository.delete_events_not_in(1, ["a"])
+    await repository.delete_events_not_in(1, ["a"])
+
+    assert "events_incoming" in str(session.statements[0])
+    assert "events_incoming" not in str(session.statements[1])
@@ -1,6 +1,10 @@
 from fastapi.testclient import TestClient
 
+from api.core.exceptions import DashscopeError
+from api.core.security import get_current_user
 from api.main import app
+from api.src.dashscope.service import DashscopeService
+from api.src.users.models import User
 
 client = TestClient(app)
 
@@ -9,3 +13,68 @@ def test_health_check():
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+def test_dashscope_error_returns_unsuccessful_response(monkeypatch):
+    async def failing_greeting(user):
+        raise DashscopeError("upstream unavailable")
+
+    monkeypatch.setattr(DashscopeService, "get_greeting", failing_greeting)
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, is_active=True)
+    try:
+        response = client.post("/api/v1/dashscope/greeting")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "success": False,
+        "data": None,
+        "message": "upstream unavailable",
+    }
+
+
+def test_unexpected_service_failure_returns_unsuccessful_response(monkeypatch):
+    async def broken_stream(*args, **kwargs):
+        raise RuntimeError("model crashed")
+        yield
+
+    monkeypatch.setattr(DashscopeService, "chat_stream", broken_stream)
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, is_active=True)
+    try:
+        response = client.post(
+            "/api/v1/dashscope/chat",
+            json={"prompt": "hi", "recent_status_data": []},
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "success": False,
+        "data": None,
+        "message": "model crashed",
+    }
+
+
+def test_dashscope_chat_stream_sends_server_sent_events():
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, is_active=True)
+    try:
+        response = client.post(
+            "/api/v1/dashscope/chat/stream",
+            json={"prompt": "hi", "recent_status_data": []},
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [line for line in response.text.split("\n\n") if line]
+    assert events[0] == 'data: {"text":"收到您的消息：hi。"}'
+    assert len(events) == 2
+
+
+def test_cors_wildcard_does_not_echo_origin():
+    response = client.get("/health", headers={"Origin": "https://example.com"})
+    assert response.headers["access-control-allow-origin"] == "*"
+    assert "access-control-allow-credentials" not in response.headers
@@ -0,0 +1,243 @@
+import asyncio
+import time
+from datetime import timedelta
+
+import pytest
+
+from api.core import security
+from api.core.exceptions import (
+    AlreadyExistsException,
+    NotFoundException,
+    UnauthorizedException,
+)
+from api.src.users import service as user_service
+from api.src.users.models import User
+from api.src.users.repository import UserRepository, forget_missing
+from api.src.users.schemas import AppleLoginRequest, LoginData
+from api.src.users.service import UserService
+
+
+async def test_missing_email_lookup_is_cached_until_forgotten(monkeypatch):
+    calls = []
+
+    async def get_by_email(self, email):
+        calls.append(email)
+        return None
+
+    monkeypatch.setattr(UserRepository, "get_by_email", get_by_email)
+    repository = UserRepository(session=None)
+
+    assert await repository.find_by_email_cached("new@example.com") is None
+    assert await repository.find_by_email_cached("new@example.com") is None
+    assert calls == ["new@example.com"]
+
+    forget_missing(email="new@example.com")
+    await repository.find_by_email_cached("new@example.com")
+    assert len(calls) == 2
+
+
+async def test_authenticate_unknown_email_still_checks_a_hash(monkeypatch):
+    checked = []
+
+    async def get_by_email(self, email):
+        return None
+
+    def verify_password(plain_password, hashed_password):
+        checked.append(hashed_password)
+        return False
+
+    monkeypatch.setattr(UserRepository, "get_by_email", get_by_email)
+    monkeypatch.setattr(user_service, "verify_password", verify_password)
+
+    with pytest.raises(UnauthorizedException):
+        await UserService(session=None).authenticate(
+            LoginData(email="nobody@example.com", password="secret")
+        )
+
+    assert checked == [user_service._DUMMY_HASH]
+
+
+def test_refresh_token_verification_is_cached_only_when_valid(monkeypatch):
+    decoded = []
+    real_decode = security.jwt.decode
+
+    def decode(*args, **kwargs):
+        decoded.append(args[0])
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(security.jwt, "decode", decode)
+    token = security.create_refresh_token(data={"sub": "1"})
+
+    assert security.verify_refresh_token(token)["sub"] == "1"
+    assert security.verify_refresh_token(token)["sub"] == "1"
+    assert decoded == [token]
+
+    assert security.verify_refresh_token("not-a-token") is None
+    assert security.verify_refresh_token("not-a-token") is None
+    assert decoded == [token, "not-a-token", "not-a-token"]
+
+
+async def test_authenticate_apple_only_user_is_rejected(monkeypatch):
+    async def get_by_email(self, email):
+        return User(id=1, email=email, hashed_password=None, is_active=True)
+
+    monkeypatch.setattr(UserRepository, "get_by_email", get_by_email)
+
+    with pytest.raises(UnauthorizedException):
+        await UserService(session=None).authenticate(
+            LoginData(email="apple@example.com", password="secret")
+        )
+
+
+async def test_apple_login_uses_single_upsert(monkeypatch):
+    upserts = []
+
+    async def verify_authorization_code(code):
+        return {"apple_id": "apple-1", "email": None}
+
+    async def upsert_apple_user(self, apple_id, email):
+        upserts.append((apple_id, email))
+        return User(id=7, email="kept@example.com", apple_id=apple_id, is_active=True)
+
+    async def get_by_apple_id(self, apple_id):
+        raise AssertionError("Apple login should not look the user up first")
+
+    monkeypatch.setattr(
+        user_service.apple_oauth, "verify_authorization_code", verify_authorization_code
+    )
+    monkeypatch.setattr(UserRepository, "upsert_apple_user", upsert_apple_user)
+    monkeypatch.setattr(UserRepository, "get_by_apple_id", get_by_apple_id)
+
+    token = await UserService(session=None).authenticate_with_apple(
+        AppleLoginRequest(authorization_code="code")
+    )
+
+    assert upserts == [("apple-1", None)]
+    assert security.verify_refresh_token(token.refresh_token)["sub"] == "7"
+
+
+def test_token_pair_matches_jose_tokens():
+    access_token, refresh_token = security.create_token_pair("42")
+
+    access = security.jwt.decode(
+        access_token, security.settings.JWT_SECRET, algorithms=["HS256"]
+    )
+    assert access["sub"] == "42" and access["type"] == "access"
+    assert security.verify_refresh_token(refresh_token)["sub"] == "42"
+    jose_token = security.jwt.encode(
+        {"sub": "42"}, security.settings.JWT_SECRET, algorithm="HS256"
+    )
+    assert access_token.split(".")[0] == jose_token.split(".")[0]
+
+
+def test_single_tokens_share_the_pair_encoder():
+    access = security.jwt.decode(
+        security.create_access_token({"sub": "7"}, expires_delta=timedelta(minutes=5)),
+        security.settings.JWT_SECRET,
+        algorithms=["HS256"],
+    )
+    assert access["type"] == "access"
+    assert 295 <= access["exp"] - time.time() <= 300
+    assert security.verify_refresh_token(security.create_refresh_token({"sub": "7"}))
+
+
+async def test_refresh_tokens_loads_only_the_active_flag(monkeypatch):
+    async def get_active_flag(self, user_id):
+        return {1: True, 2: False}.get(user_id)
+
+    async def get_by_id(self, user_id):
+        raise AssertionError("refresh should not load the full user")
+
+    monkeypatch.setattr(UserRepository, "get_active_flag", get_active_flag)
+    monkeypatch.setattr(UserRepository, "get_by_id", get_by_id)
+    service = UserService(session=None)
+
+    token = await service.refresh_tokens(security.create_refresh_token({"sub": "1"}))
+    assert security.verify_refresh_token(token.refresh_token)["sub"] == "1"
+
+    for sub in ("2", "3"):
+        with pytest.raises(UnauthorizedException):
+            await service.refresh_tokens(security.create_refresh_token({"sub": sub}))
+
+
+async def test_concurrent_refreshes_with_same_token_share_one_lookup(monkeypatch):
+    lookups = []
+
+    async def get_active_flag(self, user_id):
+        lookups.append(user_id)
+        await asyncio.sleep(0.01)
+        return True
+
+    monkeypatch.setattr(UserRepository, "get_active_flag", get_active_flag)
+    refresh_token = security.create_refresh_token({"sub": "1"})
+
+    first, second = await asyncio.gather(
+        UserService(session=None).refresh_tokens(refresh_token),
+        UserService(session=None).refresh_tokens(refresh_token),
+    )
+
+    assert lookups == [1]
+    assert first is second
+    assert user_service._inflight_refreshes == {}
+
+
+async def test_apple_login_without_subject_is_rejected(monkeypatch):
+    async def verify_authorization_code(code):
+        return {"apple_id": None, "email": "someone@example.com"}
+
+    async def upsert_apple_user(self, apple_id, email):
+        raise AssertionError("a missing Apple ID must not reach the database")
+
+    monkeypatch.setattr(
+        user_service.apple_oauth, "verify_authorization_code", verify_authorization_code
+    )
+    monkeypatch.setattr(UserRepository, "upsert_apple_user", upsert_apple_user)
+
+    with pytest.raises(UnauthorizedException):
+        await UserService(session=None).authenticate_with_apple(
+            AppleLoginRequest(authorization_code="code")
+        )
+
+
+async def test_active_flag_distinguishes_missing_user_from_null_flag():
+    class Result:
+        def __init__(self, row):
+            self.row = row
+
+        def one_or_none(self):
+            return self.row
+
+    class Session:
+        def __init__(self, row):
+            self.row = row
+
+        async def execute(self, query):
+            return Result(self.row)
+
+    null_flag = type("Row", (), {"is_active": None})()
+
+    assert await UserRepository(Session(None)).get_active_flag(1) is None
+    assert await UserRepository(Session(null_flag)).get_active_flag(1) is False
+
+
+@pytest.mark.parametrize(
+    ("existing", "error"),
+    [(None, NotFoundException), (User(id=1), AlreadyExistsException)],
+)
+async def test_link_apple_account_reports_why_nothing_was_linked(existing, error):
+    class Result:
+        def one_or_none(self):
+            return None
+
+    class Session:
+        async def scalars(self, stmt, execution_options=None):
+            return Result()
+
+        async def rollback(self):
+            pass
+
+        async def get(self, model, ident):
+            return existing
+
+    with pytest.raises(error):
+        await UserRepository(Session()).link_apple_account(1, "apple-1")